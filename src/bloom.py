@@ -0,0 +1,102 @@
+"""
+Bloom filter for SpruceDB SSTables.
+
+A compact probabilistic set used to skip SSTables that cannot contain a key:
+a negative answer is always correct, a positive answer may be a false positive.
+Bit positions are derived from a single 128-bit hash using double hashing
+(Kirsch-Mitzenmacher), so each key is hashed only once.
+
+Serialized format:
+- Hash function count (4 bytes)
+- Bit count (4 bytes)
+- Bit array (bit count / 8 bytes, rounded up)
+"""
+
+import hashlib
+import math
+import struct
+from typing import Final, Optional, Tuple
+
+# ~1% false positive rate at the optimal hash count
+DEFAULT_BITS_PER_KEY: Final[int] = 10
+MIN_BITS: Final[int] = 64
+MAX_HASHES: Final[int] = 30
+
+BLOOM_HEADER_FORMAT: Final[str] = "!II"  # hash count, bit count
+BLOOM_HEADER_SIZE: Final[int] = struct.calcsize(BLOOM_HEADER_FORMAT)
+_BLOOM_HEADER_STRUCT: Final[struct.Struct] = struct.Struct(BLOOM_HEADER_FORMAT)
+
+
+def hash_key(key: bytes) -> Tuple[int, int]:
+    """Hash a key into the two 64-bit values used to derive bit positions."""
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    # force the step to be odd so probes never collapse onto one bit
+    return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+
+class BloomFilter:
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None) -> None:
+        if num_bits <= 0:
+            raise ValueError("bloom filter must have at least one bit")
+        if num_hashes <= 0:
+            raise ValueError("bloom filter must use at least one hash function")
+
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        byte_count = (num_bits + 7) // 8
+
+        if bits is None:
+            bits = bytearray(byte_count)
+        elif len(bits) != byte_count:
+            raise ValueError(f"expected {byte_count} bytes of filter bits, got {len(bits)}")
+        self._bits = bits
+
+    @classmethod
+    def for_capacity(cls, expected_items: int, bits_per_key: int = DEFAULT_BITS_PER_KEY) -> 'BloomFilter':
+        """Create an empty filter sized for the expected number of keys."""
+        num_bits = max(MIN_BITS, expected_items * bits_per_key)
+        num_hashes = max(1, min(MAX_HASHES, round(bits_per_key * math.log(2))))
+        return cls(num_bits, num_hashes)
+
+    def add(self, key: bytes) -> None:
+        self.add_hash(hash_key(key))
+
+    def add_hash(self, key_hash: Tuple[int, int]) -> None:
+        """Add a key given its precomputed hash_key() value."""
+        h1, h2 = key_hash
+        bits = self._bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key: bytes) -> bool:
+        """Return False if the key was definitely never added."""
+        return self.might_contain_hash(hash_key(key))
+
+    def might_contain_hash(self, key_hash: Tuple[int, int]) -> bool:
+        """might_contain() for a precomputed hash_key() value."""
+        h1, h2 = key_hash
+        bits = self._bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def serialize(self) -> bytes:
+        return _BLOOM_HEADER_STRUCT.pack(self.num_hashes, self.num_bits) + bytes(self._bits)
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> 'BloomFilter':
+        if len(data) < BLOOM_HEADER_SIZE:
+            raise ValueError("Data too short for bloom filter header")
+
+        num_hashes, num_bits = _BLOOM_HEADER_STRUCT.unpack_from(data)
+        byte_count = (num_bits + 7) // 8
+        if len(data) < BLOOM_HEADER_SIZE + byte_count:
+            raise ValueError("Data too short for bloom filter bits")
+
+        bits = bytearray(data[BLOOM_HEADER_SIZE:BLOOM_HEADER_SIZE + byte_count])
+        return cls(num_bits, num_hashes, bits)
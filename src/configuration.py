@@ -1,12 +1,24 @@
 import os
 import logging
 import sys
-from typing import Optional
+from typing import Optional, Tuple
+
+# (level, format, file) the "sprucedb" logger was last set up with, so that
+# constructing another Configuration with the same settings leaves the
+# existing handlers alone
+_logging_settings: Optional[Tuple[str, str, Optional[str]]] = None
 
 class Configuration:
     def __init__(self) -> None:
         self.base_path: str = os.environ.get("SPRUCE_BASE_PATH", "spruce_data")
         self.memtable_flush_threshold: int = int(os.environ.get("SPRUCE_FLUSH_THRESHOLD", 4200000))
+        # max number of SSTable readers kept open between gets
+        self.sstable_reader_cache_size: int = int(os.environ.get("SPRUCE_READER_CACHE_SIZE", 128))
+        # how many SSTables a get may search concurrently (1 = one at a time)
+        self.sstable_read_parallelism: int = int(os.environ.get("SPRUCE_READ_PARALLELISM", 1))
+        # write flushed SSTables as zlib-compressed blocks
+        self.sstable_compression: bool = os.environ.get(
+            "SPRUCE_COMPRESSION", "").lower() in ("1", "true", "yes", "on")
         
         # Logging configuration
         self.log_level: str = os.environ.get("SPRUCE_LOG_LEVEL", "INFO").upper()
@@ -19,8 +31,19 @@ class Configuration:
         # Initialize logging
         self._setup_logging()
     
-    def _setup_logging(self) -> None:
+    def reconfigure_logging(self) -> None:
+        """Rebuild the logging handlers even if the settings have not changed."""
+        self._setup_logging(force=True)
+    
+    def _setup_logging(self, force: bool = False) -> None:
         """Configure logging for the application."""
+        global _logging_settings
+        
+        settings = (self.log_level, self.log_format, self.log_file)
+        if not force and settings == _logging_settings:
+            return
+        _logging_settings = settings
+        
         # Get numeric log level
         numeric_level = getattr(logging, self.log_level, logging.INFO)
         
@@ -34,6 +57,7 @@ class Configuration:
         # Remove existing handlers to avoid duplicates
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
+            handler.close()
         
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
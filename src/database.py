@@ -1,13 +1,27 @@
 import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from src.bloom import BloomFilter, hash_key
 from src.configuration import Configuration
 from src.entry import DatabaseEntry
-from src.sstable import SSTableReader, SSTableWriter
+from src.sstable import SSTableFeatureFlags, SSTableReader, SSTableWriter
 
 from .wal import WriteAheadLog
-from .skiplist import SkipList
+from .memtable import Memtable
+
+# after a failed flush, writes that cross the threshold wait this long before
+# retrying it, doubling per consecutive failure up to the max, so a
+# persistent error (e.g. a full disk) isn't paid for by every put
+FLUSH_RETRY_BASE_DELAY = 1.0  # seconds
+FLUSH_RETRY_MAX_DELAY = 60.0  # seconds
+# while a failed flush waits out its backoff, the active memtable may grow to
+# this many times the flush threshold before writes are held until the retry
+FLUSH_BACKLOG_FACTOR = 4
 
 class Database:
     def __init__(self, config: Configuration):
@@ -29,9 +43,36 @@ class Database:
         self._init_directories()
         
         # Initialize components
-        self.memtable: SkipList[DatabaseEntry] = SkipList()
+        self.memtable: Memtable[DatabaseEntry] = Memtable()
         self.wal: WriteAheadLog = WriteAheadLog(str(self._init_wal_path()))
 
+        # SSTable paths, newest first. Read from disk once here and then kept
+        # up to date by flushes, so reads don't list the directory.
+        self._sst_files: List[Path] = self._discover_sstable_files()
+        # open readers by SSTable path, least recently used first
+        self._reader_cache: OrderedDict[Path, SSTableReader] = OrderedDict()
+        # bloom filters by SSTable path (None = SSTable has no filter). Unlike
+        # readers these are small and never evicted, so a miss can skip an
+        # SSTable without reopening it.
+        self._bloom_cache: Dict[Path, Optional[BloomFilter]] = {}
+        # worker pool for parallel SSTable searches, created on first use
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+
+        # Flushes run on a single background thread. The memtable being
+        # flushed stays searchable as _flushing_memtable until its SSTable is
+        # in _sst_files; _flushing_wal holds the (WAL path, marker sequence)
+        # it still needs marking with.
+        self._flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sprucedb-flush")
+        self._flush_future: Optional[Future[None]] = None
+        self._flushing_memtable: Optional[Memtable[DatabaseEntry]] = None
+        self._flushing_wal: Optional[Tuple[str, int]] = None
+        # a flushed memtable, emptied and kept for reuse by the next swap
+        self._spare_memtable: Optional[Memtable[DatabaseEntry]] = None
+        # consecutive failed flushes, and the time.monotonic() before which
+        # a write won't retry the failed one
+        self._flush_failures = 0
+        self._flush_retry_at = 0.0
+
         # Replay existing WAL files to recover data and sequence numbers
         recovered_seq_no = self._replay_wal_files()
         self.seq_no = recovered_seq_no
@@ -41,6 +82,10 @@ class Database:
         
     def _init_directories(self) -> None:
         """Create necessary directory structure if it doesn't exist."""
+        # Fast path for an existing database: three stats instead of four mkdirs
+        if self.sstables_dir.is_dir() and self.wal_dir.is_dir() and self.manifest_dir.is_dir():
+            return
+        
         try:
             # Create base directory and subdirectories
             self.base_path.mkdir(parents=True, exist_ok=True)
@@ -54,12 +99,27 @@ class Database:
             
     def _init_wal_path(self) -> Path:
         """Initialize the Write-Ahead Log path."""
-        try:
-            wal_path = self.wal_dir / "current.wal"
-            return wal_path
-        except Exception as e:
-            self.logger.error("Failed to initialize WAL: %s", e)
-            raise RuntimeError(f"Failed to initialize WAL: {e}")
+        return self.wal_dir / "current.wal"
+
+    def _discover_sstable_files(self) -> List[Path]:
+        """
+        Discover existing SSTable files, newest first.
+        
+        Returns:
+            List[Path]: SSTable files sorted by creation time (newest first)
+        """
+        # Sort by timestamp in filename (newest first)
+        # SSTable filenames are like "sstable.20240101120000000000"
+        # The timestamp (last part after final dot) is extracted once per file
+        # and the (timestamp, path) pairs sorted directly. scandir gives the
+        # names and file types without a stat or Path object per entry.
+        with os.scandir(self.sstables_dir) as it:
+            keyed_files = [
+                (f.name.rpartition('.')[2], f.path) for f in it
+                if '.' in f.name and f.is_file()
+            ]
+        keyed_files.sort(reverse=True)
+        return [Path(path) for _, path in keyed_files]
 
     def _discover_wal_files(self) -> List[Path]:
         """
@@ -71,46 +131,29 @@ class Database:
         if not self.wal_dir.exists():
             return []
         
-        wal_files = []
-        for file_path in self.wal_dir.iterdir():
-            if file_path.is_file() and file_path.name.startswith("current.wal."):
-                wal_files.append(file_path)
-        
         # Sort by timestamp in filename (oldest first for replay order)
         # WAL filenames are like "current.wal.20240101120000.0"
-        # Extract timestamp part and sort chronologically
-        def extract_timestamp(path: Path) -> str:
-            parts = path.name.split('.')
+        # Files rotated within the same second share a timestamp, so the
+        # trailing counter breaks ties
+        def sort_key(name: str) -> Tuple[str, int]:
+            parts = name.split('.')
+            if len(parts) >= 4 and parts[3].isdigit():
+                return parts[2], int(parts[3])
             if len(parts) >= 3:
-                return parts[2]  # timestamp part
-            return "0"  # fallback for malformed names
+                return parts[2], 0  # timestamp part
+            return "0", 0  # fallback for malformed names
         
-        wal_files.sort(key=extract_timestamp)
+        with os.scandir(self.wal_dir) as it:
+            keyed_files = [
+                (sort_key(f.name), f.path) for f in it
+                if f.name.startswith("current.wal.") and f.is_file()
+            ]
+        keyed_files.sort()
+        wal_files = [Path(path) for _, path in keyed_files]
         
         self.logger.debug("Discovered %d WAL files for replay", len(wal_files))
         return wal_files
 
-    def _should_replay_wal_file(self, wal_file_path: str) -> bool:
-        """
-        Determine if a WAL file should be replayed by checking if it ends with a FLUSH marker.
-        
-        WAL files that end with FLUSH markers have been completely flushed to SSTables
-        and their entries should not be replayed to avoid duplicating data.
-        
-        Args:
-            wal_file_path: Path to the WAL file to check
-            
-        Returns:
-            bool: True if file should be replayed, False if it's been fully flushed
-        """
-        # Use efficient method to check for FLUSH marker at end
-        if WriteAheadLog.has_flush_marker_at_end(wal_file_path):
-            self.logger.debug("WAL file %s ends with FLUSH marker, skipping replay", 
-                            wal_file_path)
-            return False
-        
-        return True
-
     def _replay_wal_files(self) -> int:
         """
         Replay WAL files that haven't been fully flushed to SSTables.
@@ -132,19 +175,17 @@ class Database:
         files_skipped = 0
         
         for wal_file in wal_files:
-            # Check if this WAL file has been fully flushed
-            if not self._should_replay_wal_file(str(wal_file)):
+            # WAL files that end with a FLUSH marker have been completely flushed
+            # to SSTables, and replaying them would duplicate that data
+            flush_marker = WriteAheadLog.read_flush_marker_at_end(str(wal_file))
+            if flush_marker is not None:
                 files_skipped += 1
                 self.logger.debug("Skipping fully flushed WAL file: %s", wal_file.name)
                 
-                # Still need to track sequence numbers from skipped files
-                # TODO - not sure we need this
-                try:
-                    for wal_entry in WriteAheadLog.read_all_entries(str(wal_file)):
-                        highest_sequence = max(highest_sequence, wal_entry.sequence)
-                except Exception as e:
-                    self.logger.warning("Error reading sequence numbers from %s: %s", 
-                                      wal_file.name, e)
+                # Sequence numbers must still move past everything in the file
+                # (even if every WAL was flushed); the marker is written after
+                # all of the file's entries, so it carries the highest one
+                highest_sequence = max(highest_sequence, flush_marker.sequence)
                 continue
             
             self.logger.info("Replaying WAL file: %s", wal_file.name)
@@ -186,92 +227,329 @@ class Database:
         return highest_sequence
             
     def close(self) -> None:
-        """Safely close the database."""
+        """
+        Safely close the database.
+        
+        close() waits for an in-flight flush but does not start or retry one.
+        Anything not yet in an SSTable (the active memtable, or a memtable
+        whose flush failed) is still in its WAL file, which has no flush
+        marker, so the next Database opened on the same path replays it.
+        """
+        self._wait_for_flush()
+        self._flush_executor.shutdown(wait=True)
+        if self._flushing_memtable is not None:
+            self.logger.warning("Closing with an unflushed memtable; its entries will be replayed from %s",
+                                self._flushing_wal[0] if self._flushing_wal else "the WAL")
+        if self._read_executor is not None:
+            self._read_executor.shutdown(wait=True)
+            self._read_executor = None
+        for reader in self._reader_cache.values():
+            reader.close()
+        self._reader_cache.clear()
         if self.wal:
             self.wal.close()
         self.logger.info("Database closed")
 
     def _get_next_sequence(self) -> int:
-        self.seq_no = self.seq_no + 1
-        return self.seq_no
+        seq_num = self.seq_no = self.seq_no + 1
+        return seq_num
     
     def _should_flush(self) -> bool:
         return self.memtable.size >= self.config.memtable_flush_threshold
     
     def _flush_memtable_to_sstable(self) -> None:
-        # use generator from memtable to feed data to SSTableWriter
-        writer = SSTableWriter(base_path=str(self.sstables_dir))
-        for entry in self.memtable:
-            writer.add_entry(entry)
+        """Flush the memtable to an SSTable and wait until it has been written."""
+        self._start_flush(force=True)
+        self._wait_for_flush()
+
+    def _start_flush(self, force: bool = False) -> None:
+        """
+        Swap in an empty memtable and flush the full one on the flush thread.
         
-        # Get the SSTable ID before finalizing
-        sstable_id = writer.sstable_id
+        Only one flush runs at a time, so if the previous one is still going
+        this waits for it rather than letting memtables pile up. If the
+        previous flush failed, it is retried instead of swapping again, so
+        its memtable stays searchable until it reaches an SSTable. Unless
+        forced, the retry waits out the backoff set by the failure; until
+        then this returns without doing anything, unless the active memtable
+        has reached FLUSH_BACKLOG_FACTOR times the threshold, in which case
+        it sleeps until the retry is due so writers can't outrun the flush.
+        """
+        self._wait_for_flush()
         
-        # Finalize the SSTable
-        writer.finalize()
+        if self._flushing_memtable is not None and not force:
+            delay = self._flush_retry_at - time.monotonic()
+            if delay > 0:
+                if self.memtable.size < self.config.memtable_flush_threshold * FLUSH_BACKLOG_FACTOR:
+                    return
+                self.logger.warning("Memtable backlog is over %d times the flush threshold; "
+                                    "holding writes %.1fs for the flush retry", FLUSH_BACKLOG_FACTOR, delay)
+                time.sleep(delay)
         
-        # rotate WAL with the actual SSTable ID
-        old_path = self.wal.rotate(sstable_id=sstable_id, sequence=self._get_next_sequence())
-        self.logger.debug(f'Rotated WAL - closed file -> {old_path}')
+        if self._flushing_memtable is None:
+            # the WAL switches files at the swap, so the old file holds
+            # exactly the swapped-out memtable's entries; its flush marker
+            # takes the next sequence so it is the highest in that file
+            self._flushing_memtable = self.memtable
+            self.memtable = self._spare_memtable or Memtable()
+            self._spare_memtable = None
+            old_path = self.wal.start_new_file()
+            self._flushing_wal = (old_path, self._get_next_sequence())
+            self.logger.debug('Switched WAL files for flush - closed file -> %s', old_path)
+        
+        assert self._flushing_wal is not None
+        self._flush_future = self._flush_executor.submit(
+            self._flush_impl, self._flushing_memtable, *self._flushing_wal)
+
+    def _wait_for_flush(self) -> None:
+        """Wait for the in-flight flush, if any. Failures are logged by the flush itself."""
+        future = self._flush_future
+        if future is not None:
+            self._flush_future = None
+            wait([future])
 
-        # reset memtable - but TODO, could this cause data loss?
-        # if data is written to current memtable after flush but before replacement?
-        self.memtable = SkipList()
+    def _flush_impl(self, memtable: Memtable[DatabaseEntry], wal_path: str, marker_sequence: int) -> None:
+        try:
+            features = SSTableFeatureFlags.BLOOM_FILTER
+            if self.config.sstable_compression:
+                features |= SSTableFeatureFlags.COMPRESSION
+            # use generator from memtable to feed data to SSTableWriter
+            writer = SSTableWriter(base_path=str(self.sstables_dir / "sstable"),
+                                   features=features)
+            try:
+                for entry in memtable:
+                    writer.add_entry(entry)
+                
+                # Finalize the SSTable
+                writer.finalize()
+            except BaseException:
+                # don't leave a partial SSTable for the next startup to find
+                writer.discard()
+                raise
+        except Exception as e:
+            self._flush_failures += 1
+            delay = min(FLUSH_RETRY_BASE_DELAY * 2 ** (self._flush_failures - 1), FLUSH_RETRY_MAX_DELAY)
+            self._flush_retry_at = time.monotonic() + delay
+            self.logger.error("Failed to flush memtable (WAL file %s, attempt %d, retrying in %.0fs): %s",
+                              wal_path, self._flush_failures, delay, e)
+            raise
+        
+        sstable_id = writer.sstable_id
+        sst_path = Path(writer.sstable_path)
+        self._bloom_cache[sst_path] = writer.bloom_filter
+        
+        # publish the SSTable before dropping the memtable, so a concurrent
+        # get always finds the data in one or the other. The list is
+        # replaced rather than modified, as gets may be iterating it.
+        self._sst_files = [sst_path] + self._sst_files
+        self._flushing_memtable = None
+        self._flushing_wal = None
+        self._flush_failures = 0
+        memtable.clear()
+        self._spare_memtable = memtable
+        
+        # mark the old WAL file with the actual SSTable ID. The flush has
+        # already succeeded at this point: without the marker the file is
+        # just replayed on the next startup, rewriting the same entries into
+        # the memtable, so a failure here is only worth a warning.
+        try:
+            WriteAheadLog.append_flush_marker(wal_path, sstable_id, marker_sequence)
+        except Exception as e:
+            self.logger.warning("Flushed memtable to %s but failed to mark WAL file %s: %s",
+                                sst_path.name, wal_path, e)
+            return
+        self.logger.debug('Flushed memtable to %s - marked WAL file %s', sst_path.name, wal_path)
 
-    def put(self, key: str, value: bytes) -> None:
-        seq_num = self._get_next_sequence()
+    def put(self, key: str, value: bytes, sync: bool = True) -> None:
+        # sequence allocation and the flush check are inlined here (rather than
+        # going through _get_next_sequence/_should_flush) since this is the
+        # hottest path in the database
+        seq_num = self.seq_no = self.seq_no + 1
 
         entry = DatabaseEntry.put(key, seq_num, value)
-        self.wal.write_to_log(entry)
+        self.wal.write_to_log(entry, sync=sync)
 
-        self.memtable.insert(key, entry)
+        memtable = self.memtable
+        memtable.insert(entry.key, entry)
 
         # could also consider checking every N inserts instead of every single time
-        if self._should_flush():
-            self._flush_memtable_to_sstable()
+        if memtable.size >= self.config.memtable_flush_threshold:
+            self._start_flush()
 
 
+    def put_batch(self, items: Iterable[Tuple[str, bytes]], sync: bool = True) -> None:
+        """
+        Put several key/value pairs with one WAL write and one fsync.
+
+        Pairs are applied in order, so a key repeated in the batch ends up
+        with its last value. The batch is all-or-nothing at the WAL: if any
+        pair is invalid nothing is logged or applied, though the sequence
+        numbers it was given are still consumed, same as a failed put.
+        """
+        seq_num = self.seq_no
+        entries = []
+        try:
+            for key, value in items:
+                seq_num += 1
+                entries.append(DatabaseEntry.put(key, seq_num, value))
+        finally:
+            self.seq_no = seq_num
+
+        if not entries:
+            return
+
+        self.wal.write_batch(entries, sync=sync)
+
+        memtable = self.memtable
+        for entry in entries:
+            memtable.insert(entry.key, entry)
+
+        if memtable.size >= self.config.memtable_flush_threshold:
+            self._start_flush()
+
+    def async_put(self, key: str, value: bytes) -> None:
+        """
+        Put without waiting for the WAL fsync.
+
+        The write is visible to readers immediately but only becomes durable
+        with the next synced write, a flush, or close(). A crash before then
+        can lose it.
+        """
+        self.put(key, value, sync=False)
+
     def get(self, key: str) -> bytes | None:
-        # Search memtable first (most recent data)
+        # Search memtable first (most recent data), then the one being flushed
         memtable_result = self.memtable.search(key)
+        if memtable_result is None:
+            flushing = self._flushing_memtable
+            if flushing is not None:
+                memtable_result = flushing.search(key)
         if memtable_result is not None:
-            # Handle tombstones from memtable
-            if memtable_result.is_tombstone():
-                return None
+            # tombstones always carry a None value (DatabaseEntry enforces
+            # it), so the value is already the answer for both cases
             return memtable_result.value
 
+        # Only SSTables whose bloom filter admits the key need a read; the key
+        # is hashed once for all of the filter checks
+        key_hash = hash_key(key.encode("utf-8"))
+        bloom_cache = self._bloom_cache
+        candidates = []
+        for sst_file in self._sst_files:
+            bloom = bloom_cache.get(sst_file)
+            if bloom is None or bloom.might_contain_hash(key_hash):
+                candidates.append(sst_file)
+
         # Search SSTables from newest to oldest
-        sst_files = [
-            f for f in self.sstables_dir.iterdir() 
-            if f.is_file() and '.' in f.name
-        ]
-        
-        # Sort by timestamp in filename (newest first)
-        # SSTable filenames are like "base_path.20240101120000"
-        # Extract timestamp (last part after final dot) and sort in reverse
-        sst_files.sort(key=lambda f: f.name.split('.')[-1], reverse=True)
-        
+        if self.config.sstable_read_parallelism > 1 and len(candidates) > 1:
+            result = self._search_sstables_parallel(key, key_hash, candidates)
+        else:
+            result = self._search_sstables(key, key_hash, candidates)
+
+        return result.value if result is not None else None
+    
+    def _search_sstables(self, key: str, key_hash: Tuple[int, int],
+                         sst_files: List[Path]) -> Optional[DatabaseEntry]:
+        """Return the entry for key from the first SSTable (in list order) holding it."""
         for sst_file in sst_files:
             try:
-                reader = SSTableReader(str(sst_file))
-                try:
-                    result = reader.get(key)
-                    if result:
-                        if result.is_tombstone():
-                            return None
-                        return result.value
-                finally:
-                    reader.close()
+                reader = self._get_filtered_reader(sst_file, key_hash)
+                result = reader.lookup(key) if reader is not None else None
+                if result:
+                    return result
             except Exception as e:
-                self.logger.warning("Failed to read from SSTable %s while searching for key=%s: %s", 
-                                  sst_file.name, key, e)
+                self._log_read_failure(sst_file, key, e)
                 continue
 
         return None
     
+    def _search_sstables_parallel(self, key: str, key_hash: Tuple[int, int],
+                                  sst_files: List[Path]) -> Optional[DatabaseEntry]:
+        """
+        _search_sstables, but looking the key up in a window of SSTables at once.
+        
+        Results are still consumed newest first, so the answer is the same as
+        a sequential search. Each window is waited out completely before
+        returning, so no worker is still using a reader when the next get
+        gets a chance to evict and close it. The window never exceeds the
+        reader cache, so its own readers can't evict each other either.
+        """
+        window = max(1, min(self.config.sstable_read_parallelism,
+                            self.config.sstable_reader_cache_size))
+        if self._read_executor is None:
+            self._read_executor = ThreadPoolExecutor(
+                max_workers=self.config.sstable_read_parallelism,
+                thread_name_prefix="sprucedb-read",
+            )
+        executor = self._read_executor
+        
+        for start in range(0, len(sst_files), window):
+            batch = sst_files[start:start + window]
+            futures: List[Optional[Future[Optional[DatabaseEntry]]]] = []
+            for sst_file in batch:
+                try:
+                    reader = self._get_filtered_reader(sst_file, key_hash)
+                    futures.append(executor.submit(reader.lookup, key) if reader is not None else None)
+                except Exception as e:
+                    self._log_read_failure(sst_file, key, e)
+                    futures.append(None)
+            
+            try:
+                for sst_file, future in zip(batch, futures):
+                    if future is None:
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self._log_read_failure(sst_file, key, e)
+                        continue
+                    if result:
+                        return result
+            finally:
+                pending = [f for f in futures if f is not None]
+                for future in pending:
+                    future.cancel()
+                wait(pending)
+        
+        return None
+    
+    def _log_read_failure(self, sst_file: Path, key: str, error: Exception) -> None:
+        self.logger.warning("Failed to read from SSTable %s while searching for key=%s: %s", 
+                          sst_file.name, key, error)
+    
+    def _get_filtered_reader(self, sst_file: Path, key_hash: Tuple[int, int]) -> Optional[SSTableReader]:
+        """
+        Return a reader for a candidate SSTable, or None if its filter rules the key out.
+        
+        get() already checked every filter in _bloom_cache, so the reader's
+        own check is skipped; only a filter first seen by opening the
+        SSTable here still has to be checked.
+        """
+        filter_checked = sst_file in self._bloom_cache
+        reader = self._get_reader(sst_file)
+        bloom = reader.bloom_filter
+        if not filter_checked and bloom is not None and not bloom.might_contain_hash(key_hash):
+            return None
+        return reader
+    
+    def _get_reader(self, sst_file: Path) -> SSTableReader:
+        """Return an open reader for the SSTable, opening it if it isn't cached."""
+        cache = self._reader_cache
+        reader = cache.get(sst_file)
+        if reader is not None:
+            cache.move_to_end(sst_file)
+            return reader
+        
+        reader = SSTableReader(str(sst_file))
+        cache[sst_file] = reader
+        self._bloom_cache[sst_file] = reader.bloom_filter
+        if len(cache) > self.config.sstable_reader_cache_size:
+            _, evicted = cache.popitem(last=False)
+            evicted.close()
+        return reader
+    
     def delete(self, key: str) -> None:
-        seq_num = self._get_next_sequence()
+        seq_num = self.seq_no = self.seq_no + 1
         entry = DatabaseEntry.delete(key, seq_num)
 
         self.wal.write_to_log(entry)
-        self.memtable.insert(key, entry)
\ No newline at end of file
+        self.memtable.insert(entry.key, entry)
\ No newline at end of file
@@ -5,9 +5,9 @@ This module provides a common entry format that can be used by both WAL and SSTa
 while allowing each to maintain their specific serialization requirements.
 """
 
-from dataclasses import dataclass
+import sys
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class EntryType(Enum):
@@ -16,58 +16,104 @@ class EntryType(Enum):
     DELETE = 2
 
 
-@dataclass(frozen=True)
 class DatabaseEntry:
     """
     Unified database entry representation.
     
     This serves as the canonical format for entries in SpruceDB, providing
     a common interface that both WAL and SSTable can convert to/from.
+    
+    Entries are created for every write and every entry read back, so this is
+    a plain __slots__ class rather than a frozen dataclass: no per-instance
+    __dict__ and no object.__setattr__ per field. Entries are never modified
+    after construction.
     """
+    __slots__ = ('key', 'sequence', 'entry_type', 'value', 'timestamp',
+                 'key_bytes', 'sort_key', 'tombstone')
+    
     key: str
     sequence: int
     entry_type: EntryType
-    value: Optional[bytes] = None
-    timestamp: Optional[int] = None  # WAL-specific, optional for SSTable
+    value: Optional[bytes]  # always None for DELETE entries
+    timestamp: Optional[int]  # WAL-specific, optional for SSTable
+    # UTF-8 encoding of the key, computed once here so the WAL, SSTable and
+    # bloom filter paths don't each re-encode it
+    key_bytes: bytes
+    # (key, sequence), built once so ordering is a single tuple comparison;
+    # also usable directly as a sort key
+    sort_key: Tuple[str, int]
+    tombstone: bool
     
-    def __post_init__(self) -> None:
+    def __init__(self, key: str, sequence: int, entry_type: EntryType,
+                 value: Optional[bytes] = None, timestamp: Optional[int] = None) -> None:
         """Validate entry constraints."""
-        if not self.key:
-            raise ValueError("key cannot be empty")
-        
-        if self.sequence < 0:
-            raise ValueError("sequence number must be non-negative")
-            
-        if self.entry_type == EntryType.PUT and self.value is None:
+        if entry_type == EntryType.PUT and value is None:
             raise ValueError("PUT entries must have a value")
             
-        if self.entry_type == EntryType.DELETE and self.value is not None:
+        if entry_type == EntryType.DELETE and value is not None:
             raise ValueError("DELETE entries cannot have a value")
+        
+        self._init(key, sequence, entry_type, value, timestamp)
+    
+    def _init(self, key: str, sequence: int, entry_type: EntryType,
+              value: Optional[bytes], timestamp: Optional[int]) -> None:
+        # the key and sequence come from callers, so they're checked on every
+        # path; the entry type / value pairing is only checked in __init__
+        # since put() and delete() fix it themselves
+        if not key:
+            raise ValueError("key cannot be empty")
+        
+        if sequence < 0:
+            raise ValueError("sequence number must be non-negative")
+        
+        self.key = key
+        self.sequence = sequence
+        self.entry_type = entry_type
+        self.value = value
+        self.timestamp = timestamp
+        self.key_bytes = key.encode("utf-8")
+        self.sort_key = (key, sequence)
+        self.tombstone = entry_type is EntryType.DELETE
     
     @classmethod
     def put(cls, key: str, sequence: int, value: bytes, timestamp: Optional[int] = None) -> 'DatabaseEntry':
         """Create a PUT entry."""
-        return cls(key=key, sequence=sequence, entry_type=EntryType.PUT, 
-                  value=value, timestamp=timestamp)
+        # keys are interned so every version of a key, and the memtable's
+        # dict key for it, share one string object
+        entry = cls.__new__(cls)
+        entry._init(sys.intern(key), sequence, EntryType.PUT, value, timestamp)
+        return entry
     
     @classmethod 
     def delete(cls, key: str, sequence: int, timestamp: Optional[int] = None) -> 'DatabaseEntry':
         """Create a DELETE entry."""
-        return cls(key=key, sequence=sequence, entry_type=EntryType.DELETE, 
-                  value=None, timestamp=timestamp)
+        entry = cls.__new__(cls)
+        entry._init(sys.intern(key), sequence, EntryType.DELETE, None, timestamp)
+        return entry
+    
+    def __repr__(self) -> str:
+        return (f"DatabaseEntry(key={self.key!r}, sequence={self.sequence!r}, "
+                f"entry_type={self.entry_type!r}, value={self.value!r}, "
+                f"timestamp={self.timestamp!r})")
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DatabaseEntry):
+            return NotImplemented
+        return (self.key == other.key and self.sequence == other.sequence
+                and self.entry_type == other.entry_type and self.value == other.value
+                and self.timestamp == other.timestamp)
+    
+    def __hash__(self) -> int:
+        return hash((self.key, self.sequence, self.entry_type, self.value, self.timestamp))
     
     def is_tombstone(self) -> bool:
         """Check if this entry represents a deletion (tombstone)."""
-        return self.entry_type == EntryType.DELETE
+        return self.tombstone
     
     def __lt__(self, other: 'DatabaseEntry') -> bool:
         """Sort entries by key, then by sequence number (higher sequence wins for same key)."""
-        if self.key == other.key:
-            return self.sequence < other.sequence
-        return self.key < other.key
+        return self.sort_key < other.sort_key
     
     def __gt__(self, other: 'DatabaseEntry') -> bool:
         """Sort entries by key, then by sequence number (higher sequence wins for same key)."""
-        if self.key == other.key:
-            return self.sequence > other.sequence
-        return self.key > other.key 
\ No newline at end of file
+        return self.sort_key > other.sort_key 
\ No newline at end of file
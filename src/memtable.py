@@ -0,0 +1,57 @@
+from typing import Any, Dict, Generic, Iterator, List, Optional, TypeVar
+
+from .skiplist import Comparable, estimate_serialized_size
+
+
+T = TypeVar('T')
+
+class Memtable(Generic[T]):
+    """
+    Sorted in-memory table with the same interface as SkipList.
+    
+    Entries live in a plain dict, so insert/search/delete are a single hash
+    operation. Key order is only needed when the table is iterated (i.e. on
+    flush), so the sorted key list is built then, with one C-level sort, and
+    cached until a new key is added or a key is removed.
+    """
+    def __init__(self) -> None:
+        self._entries: Dict[Any, T] = {}
+        self._sorted_keys: Optional[List[Any]] = None
+        self.size = 0
+    
+    def insert(self, key: Comparable, value: T) -> None:
+        entries = self._entries
+        if key in entries:
+            # replace in place; key order is unchanged
+            old_size = estimate_serialized_size(key, entries[key])
+            self.size = self.size - old_size + estimate_serialized_size(key, value)
+        else:
+            self._sorted_keys = None
+            self.size = self.size + estimate_serialized_size(key, value)
+        entries[key] = value
+    
+    def search(self, key: Comparable) -> Optional[T]:
+        return self._entries.get(key)
+    
+    def delete(self, key: Comparable) -> None:
+        entries = self._entries
+        if key in entries:
+            self._sorted_keys = None
+            self.size = self.size - estimate_serialized_size(key, entries.pop(key))
+    
+    def clear(self) -> None:
+        """Empty the table in place so it can be reused after a flush."""
+        self._entries.clear()
+        self._sorted_keys = None
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __iter__(self) -> Iterator[T]:
+        """Yield values in key order."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._entries)
+        entries = self._entries
+        for key in self._sorted_keys:
+            yield entries[key]
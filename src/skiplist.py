@@ -1,4 +1,5 @@
-from typing import Iterator, Optional, Protocol, TypeVar, Generic, List, Any
+from typing import Iterator, Optional, Protocol, TypeVar, Generic, List, Any, Dict
+import math
 import random
 
 
@@ -12,62 +13,84 @@ class Comparable(Protocol):
     def __ge__(self, other: Any) -> bool: ...
     def __eq__(self, other: Any) -> bool: ...
 
+def estimate_serialized_size(key: Any, value: Any) -> int:
+    """
+    Estimate size of k/v pair when written to a memtable
+    """
+    key_size = len(str(key).encode('utf-8')) if not isinstance(key, bytes) else len(key)
+
+    if isinstance(value, str):
+        value_size = len(value.encode('utf-8'))
+    elif isinstance(value, bytes):
+        value_size = len(value)
+    else:
+        # just estimate based on string representation
+        value_size = len(str(value).encode('utf-8')) if value else 0
+    
+    # add 8 bytes for overhead estimate
+    return key_size + value_size + 8
+
 class Node(Generic[T]):
+    # no per-node __dict__: a node is just its key, value and forward pointers
+    __slots__ = ('key', 'value', 'forward')
+
     def __init__(self, key: Optional[Comparable], value: Optional[T], level: int = 0) -> None:
         self.key = key
         self.value = value
         self.forward: List[Optional['Node[T]']] = [None] * (level + 1)
 
+# enough levels for O(log n) walks up to ~2**32 entries at p=0.5. Only the
+# head and the scratch lists are sized by it: the walk starts at the highest
+# level actually in use, and node heights follow the level distribution
+DEFAULT_MAX_LEVEL = 32
+
 class SkipList(Generic[T]):
-    def __init__(self, p: float = 0.5, max_level: int = 4) -> None:
+    def __init__(self, p: float = 0.5, max_level: int = DEFAULT_MAX_LEVEL) -> None:
         self.max_level = max_level
         self.level = 0
         self.p = p
         self.head: Node[T] = Node(None, None, level=max_level - 1)
         self.size = 0
+        # key -> node, so point lookups and overwrites skip the level walk;
+        # the linked levels are only needed for ordered inserts and iteration
+        self._nodes: Dict[Any, Node[T]] = {}
+        # scratch list reused by every _find_update call instead of allocating
+        # one per insert/delete (so a SkipList must not be written from
+        # several threads at once). Slots above the current top level may
+        # hold stale nodes; insert resets the ones it uses to the head.
+        self._update: List[Node[T]] = [self.head] * max_level
+        # last node on each level (the head where a level is empty). A key
+        # past the current last one is appended with these as its
+        # predecessors, so ascending inserts (replay, bulk loads) skip the walk
+        self._tail: List[Node[T]] = [self.head] * max_level
         
     def _create_node(self, key: Comparable, value: T, level: int) -> Node[T]:
         return Node(key, value, level)
     
     def _random_level(self) -> int:
-        level = 0
-        while random.random() < self.p and level < self.max_level - 1:
-            level += 1
-        return level
+        if self.p == 0.5:
+            # each extra level is a fair coin flip, so the level is the number
+            # of trailing zero bits in one random draw; the sentinel top bit
+            # caps it at max_level - 1
+            top = self.max_level - 1
+            bits = random.getrandbits(top) | (1 << top)
+            return (bits & -bits).bit_length() - 1
+
+        if not 0 < self.p < 1:
+            return 0 if self.p <= 0 else self.max_level - 1
+
+        # inverse CDF of the geometric distribution: P(level >= k) = p**k.
+        # 1 - random() is in (0, 1], so the log is always defined
+        level = int(math.log(1.0 - random.random()) / math.log(self.p))
+        return min(level, self.max_level - 1)
     
     def _estimate_serialized_size(self, key: Comparable, value: T | None) -> int:
-        """
-        Estimate size of k/v pair when written to skiplist
-        """
-        key_size = len(str(key).encode('utf-8')) if not isinstance(key, bytes) else len(key)
-
-        if isinstance(value, str):
-            value_size = len(value.encode('utf-8'))
-        elif isinstance(value, bytes):
-            value_size = len(value)
-        else:
-            # just estimate based on string representation
-            value_size = len(str(value).encode('utf-8')) if value else 0
-        
-        # add 8 bytes for overhead estimate
-        return key_size + value_size + 8
+        return estimate_serialized_size(key, value)
 
     def insert(self, key: Comparable, value: T) -> None:
-        update: List[Optional[Node[T]]] = [None] * self.max_level
-        current: Optional[Node[T]] = self.head
-
-        for i in range(self.level, -1, -1):
-            while True:
-                next_node = current.forward[i] if current is not None else None
-                if next_node is not None and next_node.key is not None and next_node.key < key:
-                    current = next_node
-                else:
-                    break
-            update[i] = current
-
         # Check if key already exists and replace its value in place if so
-        existing_node = current.forward[0] if current is not None else None
-        if existing_node is not None and existing_node.key == key:
+        existing_node = self._nodes.get(key)
+        if existing_node is not None:
             # Update existing value and adjust size
             old_size = self._estimate_serialized_size(key, existing_node.value)
             new_size = self._estimate_serialized_size(key, value)
@@ -75,69 +98,84 @@ class SkipList(Generic[T]):
             self.size = self.size - old_size + new_size
             return
 
+        tail = self._tail
+        last = tail[0]
+        if last is self.head or key > last.key:
+            update = tail
+        else:
+            update = self._find_update(key)
+
         # Insert new node
         level = self._random_level()
-
         if level > self.level:
+            # the new node is the first on the levels above the old top
             for i in range(self.level + 1, level + 1):
                 update[i] = self.head
             self.level = level
 
         new_node = self._create_node(key, value, level)
+        forward = new_node.forward
         for i in range(level + 1):
             updater = update[i]
-            if updater is not None:
-                new_node.forward[i] = updater.forward[i]
-                updater.forward[i] = new_node
+            next_node = forward[i] = updater.forward[i]
+            updater.forward[i] = new_node
+            if next_node is None:
+                tail[i] = new_node
+        self._nodes[key] = new_node
 
         self.size = self.size + self._estimate_serialized_size(key, value)
 
     def search(self, key: Comparable) -> Optional[T]:
-        current: Optional[Node[T]] = self.head
+        node = self._nodes.get(key)
+        return node.value if node is not None else None
 
-        for i in range(self.level, -1, -1):
-            while True:
-                next_node = current.forward[i] if current is not None else None
-                if next_node is not None and next_node.key is not None and next_node.key < key:
-                    current = next_node
-                else:
-                    break
+    def delete(self, key: Comparable) -> None:
+        node = self._nodes.pop(key, None)
+        if node is None:
+            return
 
-        if current is not None:
-            current = current.forward[0]
+        # the node sits on levels 0..len(node.forward)-1, and on each of those
+        # its predecessor's forward pointer is the node itself
+        update = self._find_update(key)
+        for i, next_node in enumerate(node.forward):
+            update[i].forward[i] = next_node
+            if next_node is None:
+                self._tail[i] = update[i]
 
-        if current is not None and current.key is not None and current.key == key:
-            return current.value
-        return None
+        self.size = self.size - self._estimate_serialized_size(key, node.value)
 
-    def delete(self, key: Comparable) -> None:
-        update: List[Optional[Node[T]]] = [None] * self.max_level
-        current: Optional[Node[T]] = self.head
+        while self.level > 0 and self.head.forward[self.level] is None:
+            self.level -= 1
+
+    def clear(self) -> None:
+        """Empty the list in place, keeping the head node for reuse."""
+        self.head.forward = [None] * self.max_level
+        self._update = [self.head] * self.max_level
+        self._tail = [self.head] * self.max_level
+        self.level = 0
+        self.size = 0
+        self._nodes.clear()
+
+    def _find_update(self, key: Comparable) -> List[Node[T]]:
+        """
+        Return the rightmost node before key on every level up to the top.
+
+        The returned list is the shared self._update scratch list, valid
+        until the next call; slots above the current top are not set. Locals
+        are hoisted and the head sentinel (the only node with a None key) is
+        never a forward target, so the inner loop is a single comparison.
+        """
+        update = self._update
+        current = self.head
 
         for i in range(self.level, -1, -1):
-            while True:
-                next_node = current.forward[i] if current is not None else None
-                if next_node is not None and next_node.key is not None and next_node.key < key:
-                    current = next_node
-                else:
-                    break
+            next_node = current.forward[i]
+            while next_node is not None and key > next_node.key:
+                current = next_node
+                next_node = current.forward[i]
             update[i] = current
 
-        if current is not None:
-            current = current.forward[0]
-
-        if current is not None and current.key is not None and current.key == key:
-            size_reduction = self._estimate_serialized_size(key, current.value)
-
-            for i in range(self.level + 1):
-                updater = update[i]
-                if updater is not None and updater.forward[i] == current:            
-                    updater.forward[i] = current.forward[i]
-            
-            self.size = self.size - size_reduction
-            
-            while self.level > 0 and self.head.forward[self.level] is None:
-                self.level -= 1
+        return update
 
     def __iter__(self) -> Iterator[T]:
         # Start from the first actual node (skip the head sentinel)
@@ -1,11 +1,16 @@
+import bisect
+import mmap
 import os
 import struct
+import sys
+import time
 import zlib
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Flag, auto
-from typing import Final, Optional, Tuple, BinaryIO, List
+from typing import Final, Iterator, Optional, Tuple, BinaryIO, List, Union
 
+from .bloom import BloomFilter, hash_key
 from .entry import DatabaseEntry
 
 """
@@ -33,6 +38,23 @@ Sorted sequence of entries:
 - Value (bytes)
 ... (repeating for each entry)
 
+With the compression flag set, the data section is instead a sequence of
+blocks, each holding whole entries in the format above:
+- Uncompressed length (4 bytes)
+- Compressed length (4 bytes)
+- zlib-compressed entries
+... (repeating for each block)
+Index offsets then point at the start of the block holding the indexed
+entry, and the data checksum covers the blocks as stored.
+
+[BLOOM FILTER] (only when the bloom filter flag is set)
+- Serialized BloomFilter over the UTF-8 keys, see bloom.py
+- Spans from the end of the data section to the index offset
+
+[INDEX]
+- Sparse index, see the index format below (version 1 files use the
+  per-entry layout of IndexEntry instead)
+
 [FOOTER] (16 bytes)
 - Data checksum (4 bytes) - CRC32 of entire data section
 - Index offset (8 bytes) - for future optimizations
@@ -41,7 +63,8 @@ Sorted sequence of entries:
 
 # file identification
 SSTABLE_MAGIC: Final[bytes] = b"SPDB"
-SSTABLE_VERSION: Final[int] = 1
+SSTABLE_VERSION: Final[int] = 2
+PACKED_INDEX_VERSION: Final[int] = 2  # first version with the packed index layout
 
 # maximum sizes
 MAX_KEY_SIZE: Final[int] = 65536  # same as WAL
@@ -65,9 +88,12 @@ HEADER_FORMAT: Final[str] = "!4sHI16sQIQI"
 # - Footer checksum (I = 4 bytes unsigned int)
 FOOTER_FORMAT: Final[str] = "!IQI"
 
-# Index format:
+# Index format (packed, so offsets load with array.frombytes):
 # - Index entry count (I = 4 bytes unsigned int)
-# - For each index entry:
+# - File offset of each entry (Q = 8 bytes unsigned long, x count)
+# - End of each key within the key blob (Q = 8 bytes unsigned long, x count)
+# - Key blob: the UTF-8 keys back to back
+# Version 1 files instead follow the count with, for each index entry:
 #   - Key length (I = 4 bytes unsigned int)
 #   - Key (UTF-8 encoded, variable)
 #   - File offset (Q = 8 bytes unsigned long)
@@ -84,6 +110,7 @@ INDEX_ENTRY_OFFSET_FORMAT: Final[str] = "!Q"  # file offset
 SEQUENCE_FORMAT: Final[str] = "!Q"       # format for sequence number
 KEY_LENGTH_FORMAT: Final[str] = "!I"     # format for key length
 VALUE_LENGTH_FORMAT: Final[str] = "!I"   # format for value length
+ENTRY_PREFIX_FORMAT: Final[str] = "!QI"  # sequence number + key length, read together on scans
 
 # header/footer sizes
 HEADER_SIZE: Final[int] = struct.calcsize(HEADER_FORMAT)
@@ -91,12 +118,32 @@ FOOTER_SIZE: Final[int] = struct.calcsize(FOOTER_FORMAT)
 SEQUENCE_SIZE: Final[int] = struct.calcsize(SEQUENCE_FORMAT)
 KEY_LEN_SIZE: Final[int] = struct.calcsize(KEY_LENGTH_FORMAT)
 VALUE_LEN_SIZE: Final[int] = struct.calcsize(VALUE_LENGTH_FORMAT)
+ENTRY_PREFIX_SIZE: Final[int] = struct.calcsize(ENTRY_PREFIX_FORMAT)
 INDEX_HEADER_SIZE: Final[int] = struct.calcsize(INDEX_HEADER_FORMAT)
 INDEX_KEY_LEN_SIZE: Final[int] = struct.calcsize(INDEX_ENTRY_KEY_LEN_FORMAT)
 INDEX_OFFSET_SIZE: Final[int] = struct.calcsize(INDEX_ENTRY_OFFSET_FORMAT)
 
+# precompiled so per-entry packing and unpacking doesn't re-parse the formats
+ENTRY_PREFIX_STRUCT: Final[struct.Struct] = struct.Struct(ENTRY_PREFIX_FORMAT)
+VALUE_LENGTH_STRUCT: Final[struct.Struct] = struct.Struct(VALUE_LENGTH_FORMAT)
+INDEX_KEY_LEN_STRUCT: Final[struct.Struct] = struct.Struct(INDEX_ENTRY_KEY_LEN_FORMAT)
+INDEX_OFFSET_STRUCT: Final[struct.Struct] = struct.Struct(INDEX_ENTRY_OFFSET_FORMAT)
+HEADER_STRUCT: Final[struct.Struct] = struct.Struct(HEADER_FORMAT)
+FOOTER_STRUCT: Final[struct.Struct] = struct.Struct(FOOTER_FORMAT)
+INDEX_HEADER_STRUCT: Final[struct.Struct] = struct.Struct(INDEX_HEADER_FORMAT)
+CRC_STRUCT: Final[struct.Struct] = struct.Struct("!I")  # trailing CRC of the header and footer
+
 # Sparse index configuration
 DEFAULT_INDEX_INTERVAL: Final[int] = 1000  # Index every Nth entry
+INDEX_BUCKET_COUNT: Final[int] = 256  # top-level buckets keyed on the first character
+DATA_PAGE_SIZE: Final[int] = 64 * 1024  # writer buffers this much data per write/CRC update
+MAX_NAME_COLLISIONS: Final[int] = 99  # counter suffixes tried for one timestamp before giving up
+
+# Compressed data blocks: one block per data page, favouring speed over ratio
+BLOCK_HEADER_FORMAT: Final[str] = "!II"  # uncompressed length, compressed length
+BLOCK_HEADER_SIZE: Final[int] = struct.calcsize(BLOCK_HEADER_FORMAT)
+BLOCK_HEADER_STRUCT: Final[struct.Struct] = struct.Struct(BLOCK_HEADER_FORMAT)
+COMPRESSION_LEVEL: Final[int] = 1
 
 class SSTableFeatureFlags(Flag):
     """Feature flags for SSTable format"""
@@ -106,18 +153,22 @@ class SSTableFeatureFlags(Flag):
     BLOCK_BASED = auto()      # uses block-based format
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IndexEntry:
-    """Represents an entry in the sparse index."""
+    """
+    Represents an entry in a version 1 sparse index.
+    
+    The writer packs the current (packed) index layout directly; this
+    per-entry record format is only read back from version 1 files.
+    """
     key: str
     file_offset: int
     
     def serialize(self) -> bytes:
         """Serialize index entry to bytes."""
         key_bytes = self.key.encode("utf-8")
-        key_len_bytes = struct.pack(INDEX_ENTRY_KEY_LEN_FORMAT, len(key_bytes))
-        offset_bytes = struct.pack(INDEX_ENTRY_OFFSET_FORMAT, self.file_offset)
-        return key_len_bytes + key_bytes + offset_bytes
+        return b"".join((INDEX_KEY_LEN_STRUCT.pack(len(key_bytes)), key_bytes,
+                         INDEX_OFFSET_STRUCT.pack(self.file_offset)))
     
     @classmethod
     def deserialize(cls, data: bytes) -> Tuple['IndexEntry', int]:
@@ -125,7 +176,7 @@ class IndexEntry:
         if len(data) < INDEX_KEY_LEN_SIZE:
             raise ValueError("Data too short for key length")
             
-        key_length = struct.unpack(INDEX_ENTRY_KEY_LEN_FORMAT, data[:INDEX_KEY_LEN_SIZE])[0]
+        key_length = INDEX_KEY_LEN_STRUCT.unpack_from(data)[0]
         key_start = INDEX_KEY_LEN_SIZE
         key_end = key_start + key_length
         
@@ -133,7 +184,7 @@ class IndexEntry:
             raise ValueError("Data too short for index entry")
             
         key = data[key_start:key_end].decode('utf-8')
-        file_offset = struct.unpack(INDEX_ENTRY_OFFSET_FORMAT, data[key_end:key_end + INDEX_OFFSET_SIZE])[0]
+        file_offset = INDEX_OFFSET_STRUCT.unpack_from(data, key_end)[0]
         
         bytes_consumed = key_end + INDEX_OFFSET_SIZE
         return cls(key, file_offset), bytes_consumed
@@ -144,24 +195,48 @@ def serialize_entry(entry: DatabaseEntry) -> bytes:
     Serialize DatabaseEntry to SSTable format bytes:
     [sequence][key_length][key][value_length][value]
     """
-    key_bytes = entry.key.encode("utf-8")
-    # Use empty bytes for DELETE entries (tombstones)
-    value_bytes = entry.value if entry.value is not None else b''
+    buf = bytearray()
+    serialize_entry_into(buf, entry)
+    return bytes(buf)
+
+
+# zero-filled space appended for the length fields, which are then packed in place
+_ENTRY_PREFIX_PLACEHOLDER: Final[bytes] = bytes(ENTRY_PREFIX_SIZE)
+_VALUE_LENGTH_PLACEHOLDER: Final[bytes] = bytes(VALUE_LEN_SIZE)
+# the header's reserved field, always written zeroed
+_HEADER_RESERVED: Final[bytes] = bytes(16)
+
+
+def serialize_entry_into(buf: bytearray, entry: DatabaseEntry) -> int:
+    """
+    Append the serialized entry to buf, returning the number of bytes added.
+    
+    The fields are packed straight into buf, so no intermediate bytes objects
+    are built. buf is left untouched if the entry is invalid.
+    """
+    key_bytes = entry.key_bytes
+    value_bytes = entry.value
 
     if len(key_bytes) > MAX_KEY_SIZE:
         raise ValueError(f"Key size exceeds max of {MAX_KEY_SIZE} bytes")
 
-    if len(value_bytes) > MAX_VALUE_SIZE:
+    if value_bytes is not None and len(value_bytes) > MAX_VALUE_SIZE:
         raise ValueError(f"Value size exceeds max of {MAX_VALUE_SIZE} bytes")
 
     if entry.sequence < 0:
         raise ValueError("Sequence number must be non-negative")
 
-    sequence_bytes = struct.pack(SEQUENCE_FORMAT, entry.sequence)
-    key_len_bytes = struct.pack(KEY_LENGTH_FORMAT, len(key_bytes))
-    value_len_bytes = struct.pack(VALUE_LENGTH_FORMAT, len(value_bytes))
-
-    return sequence_bytes + key_len_bytes + key_bytes + value_len_bytes + value_bytes
+    start = len(buf)
+    buf += _ENTRY_PREFIX_PLACEHOLDER
+    ENTRY_PREFIX_STRUCT.pack_into(buf, start, entry.sequence, len(key_bytes))
+    buf += key_bytes
+    value_length_offset = len(buf)
+    # the zero placeholder is already a tombstone's (empty) value length
+    buf += _VALUE_LENGTH_PLACEHOLDER
+    if value_bytes:
+        VALUE_LENGTH_STRUCT.pack_into(buf, value_length_offset, len(value_bytes))
+        buf += value_bytes
+    return len(buf) - start
 
 
 def deserialize_entry(data: bytes) -> Tuple[DatabaseEntry, int]:
@@ -172,19 +247,18 @@ def deserialize_entry(data: bytes) -> Tuple[DatabaseEntry, int]:
     if len(data) < SEQUENCE_SIZE:
         raise ValueError("Data too short for sequence number")
 
-    sequence = struct.unpack(SEQUENCE_FORMAT, data[:SEQUENCE_SIZE])[0]
-
-    if len(data) < SEQUENCE_SIZE + KEY_LEN_SIZE:
+    if len(data) < ENTRY_PREFIX_SIZE:
         raise ValueError("Data too short for key length")
 
-    key_length = struct.unpack(KEY_LENGTH_FORMAT, data[SEQUENCE_SIZE:SEQUENCE_SIZE + KEY_LEN_SIZE])[0]
-    key_start = SEQUENCE_SIZE + KEY_LEN_SIZE
+    sequence, key_length = ENTRY_PREFIX_STRUCT.unpack_from(data)
+    key_start = ENTRY_PREFIX_SIZE
     key_end = key_start + key_length
     if len(data) < key_end:
         raise ValueError("Data too short for key")
 
     try:
-        key = data[key_start:key_end].decode('utf-8')
+        # decode through a memoryview so the key bytes aren't copied first
+        key = str(memoryview(data)[key_start:key_end], 'utf-8')
     except UnicodeDecodeError:
         raise ValueError("Invalid UTF-8 encoding in key")
 
@@ -192,8 +266,7 @@ def deserialize_entry(data: bytes) -> Tuple[DatabaseEntry, int]:
     if len(data) < value_length_offset + VALUE_LEN_SIZE:
         raise ValueError("Data too short for value length")
 
-    value_length = struct.unpack(VALUE_LENGTH_FORMAT,
-                                 data[value_length_offset:value_length_offset + VALUE_LEN_SIZE])[0]
+    value_length = VALUE_LENGTH_STRUCT.unpack_from(data, value_length_offset)[0]
 
     value_offset = value_length_offset + VALUE_LEN_SIZE
     if len(data) < value_offset + value_length:
@@ -211,6 +284,65 @@ def deserialize_entry(data: bytes) -> Tuple[DatabaseEntry, int]:
     return entry, bytes_consumed
 
 
+def _scan_records(buf: Union[mmap.mmap, bytes], pos: int, end: int,
+                  key: str, key_bytes: bytes) -> Tuple[Optional[DatabaseEntry], bool]:
+    """
+    Scan the entry records in buf[pos:end] for key.
+    
+    Returns the entry (or None) and whether the scan is over: True once the
+    key is found, passed, or a truncated/oversized record is hit, False if
+    the records simply ran out before the key.
+    """
+    while pos + ENTRY_PREFIX_SIZE <= end:
+        sequence, key_length = ENTRY_PREFIX_STRUCT.unpack_from(buf, pos)
+        key_start = pos + ENTRY_PREFIX_SIZE
+        key_end = key_start + key_length
+        if key_length > MAX_KEY_SIZE or key_end + VALUE_LEN_SIZE > end:
+            return None, True
+        
+        value_length = VALUE_LENGTH_STRUCT.unpack_from(buf, key_end)[0]
+        value_start = key_end + VALUE_LEN_SIZE
+        next_pos = value_start + value_length
+        if value_length > MAX_VALUE_SIZE or next_pos > end:
+            return None, True
+        
+        entry_key = buf[key_start:key_end]
+        if entry_key == key_bytes:
+            if value_length > 0:
+                return DatabaseEntry.put(key, sequence, buf[value_start:next_pos]), True
+            return DatabaseEntry.delete(key, sequence), True
+        if entry_key > key_bytes:
+            # We've passed the key, it doesn't exist
+            return None, True
+        
+        pos = next_pos
+    
+    return None, pos < end
+
+
+def _iter_records(buf: Union[mmap.mmap, bytes], pos: int, end: int) -> Iterator[DatabaseEntry]:
+    """Yield the entry records in buf[pos:end], stopping at a truncated or oversized one."""
+    while pos + ENTRY_PREFIX_SIZE <= end:
+        sequence, key_length = ENTRY_PREFIX_STRUCT.unpack_from(buf, pos)
+        key_start = pos + ENTRY_PREFIX_SIZE
+        key_end = key_start + key_length
+        if key_length > MAX_KEY_SIZE or key_end + VALUE_LEN_SIZE > end:
+            return
+        
+        value_length = VALUE_LENGTH_STRUCT.unpack_from(buf, key_end)[0]
+        value_start = key_end + VALUE_LEN_SIZE
+        next_pos = value_start + value_length
+        if value_length > MAX_VALUE_SIZE or next_pos > end:
+            return
+        
+        key = buf[key_start:key_end].decode('utf-8')
+        if value_length > 0:
+            yield DatabaseEntry.put(key, sequence, buf[value_start:next_pos])
+        else:
+            yield DatabaseEntry.delete(key, sequence)
+        pos = next_pos
+
+
 class SSTableWriter:
     def __init__(self, base_path: str, features: SSTableFeatureFlags = SSTableFeatureFlags.NONE, 
                  index_interval: int = DEFAULT_INDEX_INTERVAL):
@@ -219,35 +351,74 @@ class SSTableWriter:
         self.features = features
         self.entry_count = 0
         self.data_size = 0
-        self._last_key: Optional[str] = None  # for enforcing sorted order
+        # encoded key of the previous entry, for enforcing sorted order; UTF-8
+        # bytes sort the same as the str keys and compare with a plain memcmp
+        self._last_key: Optional[bytes] = None
         self._file: Optional[BinaryIO] = None
         self._data_start_pos = 0
         self._data_crc = 0
+        # entries are staged in a page buffer and written (and folded into the
+        # data CRC) a page at a time; _position is the file offset the next
+        # staged byte will land at, tracked here since tell() lags the buffer
+        self._page = bytearray()
+        self._position = 0
+        # with compression each page is sealed into one compressed block
+        # before it is written; _position then only advances per block, so
+        # index entries point at the start of their entry's block
+        self._compress = SSTableFeatureFlags.COMPRESSION in features
         self._index_interval = index_interval
-        self._index_entries: List[IndexEntry] = []
+        # sparse index as parallel arrays, like the reader's: the encoded
+        # keys (already on the entry) and their offsets as unboxed uint64s
+        self._index_keys: List[bytes] = []
+        self._index_offsets = array('Q')
+        # key hashes for the bloom filter, which can only be sized once the
+        # final entry count is known
+        self._bloom_hashes: Optional[List[Tuple[int, int]]] = (
+            [] if SSTableFeatureFlags.BLOOM_FILTER in features else None
+        )
+        # the filter written by finalize(), if any
+        self.bloom_filter: Optional[BloomFilter] = None
 
         os.makedirs(os.path.dirname(base_path), exist_ok=True)
-        self.filepath = self._get_timestamped_path()
-        self._file = open(self.filepath, 'wb')
-
-        self.timestamp = int(datetime.utcnow().timestamp())
-
-        header = struct.pack(
-            HEADER_FORMAT,
+        # exclusive create so a name collision can never truncate an
+        # existing SSTable. A colliding name gets a fixed-width counter
+        # suffix, which still sorts after the plain name and before any
+        # later timestamp, rather than spinning on the clock.
+        base_name = self._get_timestamped_path()
+        self.filepath = base_name
+        collisions = 0
+        while True:
+            try:
+                file = open(self.filepath, 'xb')
+                break
+            except FileExistsError:
+                collisions += 1
+                if collisions > MAX_NAME_COLLISIONS:
+                    raise
+                self.filepath = f"{base_name}-{collisions:02d}"
+        self._file = file
+
+        self.timestamp = int(time.time())
+
+        header = HEADER_STRUCT.pack(
             SSTABLE_MAGIC,
             SSTABLE_VERSION,
             features.value,
-            b'\x00' * 16, # empty bytes for the placeholder
+            _HEADER_RESERVED,
             self.timestamp,
             0, # entry count placeholder
             0, # data size placeholder
             0, # checksum placeholder
         )
         self._file.write(header)
-        self._data_start_pos = self._file.tell()
+        self._data_start_pos = self._position = self._file.tell()
 
     def _get_timestamped_path(self) -> str:
-        timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        # microsecond resolution so flushes within the same second get
+        # distinct, still lexicographically ordered, names
+        now_ns = time.time_ns()
+        seconds, nanos = divmod(now_ns, 1_000_000_000)
+        timestamp = f"{time.strftime('%Y%m%d%H%M%S', time.gmtime(seconds))}{nanos // 1000:06d}"
         return f"{self.base_path}.{timestamp}"
 
     @property 
@@ -265,87 +436,146 @@ class SSTableWriter:
         if self._file is None:
             raise RuntimeError("File not initialized")
             
-        if self._last_key is not None and self._last_key > entry.key:
+        key_bytes = entry.key_bytes
+        last_key = self._last_key
+        if last_key is not None and last_key >= key_bytes:
+            if last_key == key_bytes:
+                raise ValueError(f'Duplicate key: {entry.key}')
             raise ValueError('Entries are not in sorted order')
 
-        if self._last_key is not None and self._last_key == entry.key:
-            raise ValueError(f'Duplicate key: {entry.key}')
-
         # Record position before writing for index
-        current_position = self._file.tell()
+        current_position = self._position
         
         # Add to sparse index if this is an indexed entry
         if self.entry_count % self._index_interval == 0:
-            index_entry = IndexEntry(entry.key, current_position)
-            self._index_entries.append(index_entry)
+            self._index_keys.append(key_bytes)
+            self._index_offsets.append(current_position)
+
+        entry_size = serialize_entry_into(self._page, entry)
+        if not self._compress:
+            self._position = current_position + entry_size
+        self._last_key = key_bytes
 
-        entry_bytes = serialize_entry(entry)
-        self._file.write(entry_bytes)
-        self._last_key = entry.key
+        if self._bloom_hashes is not None:
+            self._bloom_hashes.append(hash_key(key_bytes))
 
-        self._data_crc = zlib.crc32(entry_bytes, self._data_crc)
         self.entry_count += 1
+        if len(self._page) >= DATA_PAGE_SIZE:
+            self._flush_page()
+
+    def _flush_page(self) -> None:
+        """Write the buffered data page and fold it into the data checksum."""
+        if self._file is None:
+            raise RuntimeError("File not initialized")
 
+        if self._compress:
+            self._seal_block()
+        if self._page:
+            self._data_crc = zlib.crc32(self._page, self._data_crc)
+            self._file.write(self._page)
+            self._page.clear()
+
+    def _seal_block(self) -> None:
+        """Replace the staged entries with a single compressed block record."""
+        if not self._page:
+            return
+
+        compressed = zlib.compress(self._page, COMPRESSION_LEVEL)
+        block = bytearray(BLOCK_HEADER_STRUCT.pack(len(self._page), len(compressed)))
+        block += compressed
+        self._page = block
+        self._position += len(block)
 
     def finalize(self) -> None:
         """ Write header/footer, sync to disk, close file """
         if self._file is None:
             raise RuntimeError("File not initialized")
         
-        # grab current position (end of data section)
-        end_data_pos = self._file.tell()
-        self.data_size = end_data_pos - self._data_start_pos
-
-        # Write sparse index section
+        # fold the last partial page into the data checksum, but keep it
+        # staged: the remaining sections are appended behind it so the tail
+        # of the file goes out in a single write
+        if self._compress:
+            self._seal_block()
+        self._data_crc = zlib.crc32(self._page, self._data_crc)
+        self.data_size = self._position - self._data_start_pos
+
+        # Stage bloom filter section (if enabled) and sparse index section
+        self._write_bloom_filter()
         index_offset = self._write_index()
         
         # calculate, pack, crc footer with index offset
-        footer = struct.pack(FOOTER_FORMAT, self._data_crc, index_offset, 0)
-        footer_crc = zlib.crc32(footer[:-4])
-        footer = footer[:-4] + struct.pack("!I", footer_crc)
+        footer = bytearray(FOOTER_STRUCT.pack(self._data_crc, index_offset, 0))
+        CRC_STRUCT.pack_into(footer, FOOTER_SIZE - CRC_STRUCT.size,
+                             zlib.crc32(memoryview(footer)[:-CRC_STRUCT.size]))
 
-        self._file.write(footer)
+        self._page += footer
+        self._file.write(self._page)
+        self._page.clear()
 
         # recalculate, pack, crc header with final data size
-        header = struct.pack(
-            HEADER_FORMAT,
+        header = bytearray(HEADER_STRUCT.pack(
             SSTABLE_MAGIC,
             SSTABLE_VERSION,
             self.features.value,
-            b'\x00' * 16,
+            _HEADER_RESERVED,
             self.timestamp,
             self.entry_count,
             self.data_size,
             0
-        )
-        header_crc = zlib.crc32(header[:-4])
-        header = header[:-4] + struct.pack("!I", header_crc)
-
-        # seek back to beginning and rewrite header, now with complete info
-        self._file.seek(0)
-        self._file.write(header)
+        ))
+        CRC_STRUCT.pack_into(header, HEADER_SIZE - CRC_STRUCT.size,
+                             zlib.crc32(memoryview(header)[:-CRC_STRUCT.size]))
 
+        # rewrite the header, now with complete info, with a positional
+        # write once the buffered tail is out; the file position is left
+        # alone, so there's no seek and no buffer invalidation
         self._file.flush()
-        os.fsync(self._file.fileno())
+        fd = self._file.fileno()
+        os.pwrite(fd, header, 0)
+        os.fsync(fd)
         self._file.close()
     
+    def _write_bloom_filter(self) -> None:
+        """Stage the bloom filter section if the bloom filter feature is enabled."""
+        if self._bloom_hashes is None:
+            return
+
+        bloom = BloomFilter.for_capacity(len(self._bloom_hashes))
+        for key_hash in self._bloom_hashes:
+            bloom.add_hash(key_hash)
+        self._stage(bloom.serialize())
+        self.bloom_filter = bloom
+
     def _write_index(self) -> int:
-        """Write the sparse index section and return its offset."""
-        if self._file is None:
-            raise RuntimeError("File not initialized")
-            
-        index_start_offset = self._file.tell()
-        
-        # Write index header (entry count)
-        index_header = struct.pack(INDEX_HEADER_FORMAT, len(self._index_entries))
-        self._file.write(index_header)
+        """Stage the sparse index section and return its offset."""
+        index_start_offset = self._position
         
-        # Write each index entry
-        for index_entry in self._index_entries:
-            self._file.write(index_entry.serialize())
+        # Index header (entry count), the offsets array, the key end
+        # positions array, then the key blob; arrays go out big-endian
+        keys = self._index_keys
+        key_ends = array('Q')
+        end = 0
+        for key_bytes in keys:
+            end += len(key_bytes)
+            key_ends.append(end)
+        offsets = array('Q', self._index_offsets)
+        if sys.byteorder == 'little':
+            offsets.byteswap()
+            key_ends.byteswap()
+
+        section = bytearray(INDEX_HEADER_STRUCT.pack(len(keys)))
+        section += offsets.tobytes()
+        section += key_ends.tobytes()
+        section += b"".join(keys)
+        self._stage(section)
         
         return index_start_offset
 
+    def _stage(self, data: bytes) -> None:
+        """Append non-data bytes to the page buffer (not part of the data CRC)."""
+        self._page += data
+        self._position += len(data)
+
     def discard(self) -> None:
         """ Cleanup partial SSTable if something fails """
         if self._file:
@@ -370,205 +600,327 @@ class SSTableReader:
         """Initialize reader and load sparse index."""
         self.filepath = filepath
         self._file: Optional[BinaryIO] = None
-        self._index_entries: List[IndexEntry] = []
+        # read-only map of the whole file; lookups parse entries straight out
+        # of it instead of issuing a seek + read per field
+        self._mm: Optional[mmap.mmap] = None
+        # the sparse index is held as two parallel arrays: the keys, which the
+        # binary search walks, and their data offsets packed as unboxed
+        # uint64s, which are only read once the search has settled
+        self._index_keys: List[str] = []
+        self._index_offsets = array('Q')
+        # index position found by the previous lookup, used as the starting
+        # point for an exponential search on the next one (-1 = no hint)
+        self._last_index_pos = -1
         self._data_start_pos = 0
         self._data_size = 0
+        self._bloom: Optional[BloomFilter] = None
+        # compressed files: index offsets point at blocks, and the last
+        # decompressed block is kept as (offset, data)
+        self._compressed = False
+        self._block_cache: Optional[Tuple[int, bytes]] = None
         
-        self._load_metadata()
+        # _index_bucket_starts[b] is the first index position whose key starts
+        # with a character >= chr(b); the last bucket also holds every key
+        # starting beyond chr(INDEX_BUCKET_COUNT - 1)
+        self._index_bucket_starts: List[int] = []
+        
+        self._file = open(filepath, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_RANDOM"):
+                # point lookups touch a few pages each; skip kernel readahead
+                self._mm.madvise(mmap.MADV_RANDOM)
+            self._load_metadata()
+        except Exception:
+            self.close()
+            raise
+        self._build_index_buckets()
+    
+    def _build_index_buckets(self) -> None:
+        """Build the top-level bucket table over the sparse index keys."""
+        keys = self._index_keys
+        starts = [bisect.bisect_left(keys, chr(b)) for b in range(INDEX_BUCKET_COUNT)]
+        starts.append(len(keys))
+        self._index_bucket_starts = starts
     
     def _load_metadata(self) -> None:
         """Load SSTable metadata and sparse index."""
-        with open(self.filepath, 'rb') as f:
-            # Read header to get data start position
-            f.seek(0)
-            header_data = f.read(HEADER_SIZE)
-            if len(header_data) < HEADER_SIZE:
-                raise ValueError("Invalid SSTable file: header too short")
-            
-            header_fields = struct.unpack(HEADER_FORMAT, header_data)
-            magic, version, features, reserved, timestamp, entry_count, data_size, header_crc = header_fields
-            
-            if magic != SSTABLE_MAGIC:
-                raise ValueError(f"Invalid magic number: {magic}")
-            
-            self._data_start_pos = HEADER_SIZE
-            self._data_size = data_size
-            
-            # Read footer to get index offset
-            f.seek(-FOOTER_SIZE, 2)  # Seek to footer
-            footer_data = f.read(FOOTER_SIZE)
-            if len(footer_data) < FOOTER_SIZE:
-                raise ValueError("Invalid SSTable file: footer too short")
-            
-            data_crc, index_offset, footer_crc = struct.unpack(FOOTER_FORMAT, footer_data)
-            
-            # Load sparse index if present
-            if index_offset > 0:
-                self._load_index(f, index_offset)
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
+        
+        # header and footer are unpacked in place from the map, no reads
+        if len(mm) < HEADER_SIZE:
+            raise ValueError("Invalid SSTable file: header too short")
+        
+        header_fields = HEADER_STRUCT.unpack_from(mm)
+        magic, version, features, reserved, timestamp, entry_count, data_size, header_crc = header_fields
+        
+        if magic != SSTABLE_MAGIC:
+            raise ValueError(f"Invalid magic number: {magic}")
+        if version > SSTABLE_VERSION:
+            raise ValueError(f"Unsupported SSTable version: {version}")
+        
+        self._data_start_pos = HEADER_SIZE
+        self._data_size = data_size
+        self._compressed = bool(features & SSTableFeatureFlags.COMPRESSION.value)
+        
+        # Read footer to get index offset
+        if len(mm) < HEADER_SIZE + FOOTER_SIZE:
+            raise ValueError("Invalid SSTable file: footer too short")
+        
+        data_crc, index_offset, footer_crc = FOOTER_STRUCT.unpack_from(mm, len(mm) - FOOTER_SIZE)
+        
+        # Bloom filter sits between the data section and the index
+        if features & SSTableFeatureFlags.BLOOM_FILTER.value and index_offset > 0:
+            bloom_offset = self._data_start_pos + self._data_size
+            self._bloom = BloomFilter.deserialize(mm[bloom_offset:index_offset])
+        
+        # Load sparse index if present
+        if index_offset > 0:
+            if version >= PACKED_INDEX_VERSION:
+                self._load_index(index_offset)
+            else:
+                self._load_legacy_index(index_offset)
     
-    def _load_index(self, file: BinaryIO, index_offset: int) -> None:
-        """Load the sparse index from file."""
-        file.seek(index_offset)
+    def _load_index(self, index_offset: int) -> None:
+        """
+        Load the packed sparse index from the mapped file.
+        
+        Both fixed-width arrays are loaded with a single frombytes each; the
+        keys are then decoded straight out of the blob through a view.
+        """
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
         
-        # Read index header
-        index_header_data = file.read(INDEX_HEADER_SIZE)
-        if len(index_header_data) < INDEX_HEADER_SIZE:
+        index_end = len(mm) - FOOTER_SIZE
+        if index_offset + INDEX_HEADER_SIZE > index_end:
             raise ValueError("Invalid index: header too short")
         
-        entry_count = struct.unpack(INDEX_HEADER_FORMAT, index_header_data)[0]
+        entry_count = INDEX_HEADER_STRUCT.unpack_from(mm, index_offset)[0]
+        array_size = entry_count * INDEX_OFFSET_SIZE
+        offsets_start = index_offset + INDEX_HEADER_SIZE
+        blob_start = offsets_start + 2 * array_size
+        if blob_start > index_end:
+            raise ValueError("Unexpected end of index")
         
-        # Read index entries
-        for _ in range(entry_count):
-            remaining_data = file.read(1024)  # Read in chunks
-            if not remaining_data:
-                raise ValueError("Unexpected end of index")
-            
-            index_entry, bytes_consumed = IndexEntry.deserialize(remaining_data)
-            self._index_entries.append(index_entry)
-            
-            # Seek back if we read too much
-            file.seek(-len(remaining_data) + bytes_consumed, 1)
+        offsets = self._index_offsets
+        key_ends = array('Q')
+        offsets.frombytes(mm[offsets_start:offsets_start + array_size])
+        key_ends.frombytes(mm[offsets_start + array_size:blob_start])
+        if sys.byteorder == 'little':
+            offsets.byteswap()
+            key_ends.byteswap()
+        if entry_count and blob_start + key_ends[-1] > index_end:
+            raise ValueError("Unexpected end of index")
+        
+        # the view must be released before the map can be closed, hence the with
+        with memoryview(mm) as view:
+            key_start = blob_start
+            keys = self._index_keys
+            for key_end in key_ends:
+                key_end += blob_start
+                keys.append(str(view[key_start:key_end], 'utf-8'))
+                key_start = key_end
     
-    def get(self, key: str) -> Optional[DatabaseEntry]:
-        """Get an entry by key using sparse index for fast lookup."""
-        if not self._index_entries:
-            # No index available, fall back to linear scan
-            return self._linear_scan(key)
+    def _load_legacy_index(self, index_offset: int) -> None:
+        """Load a version 1 sparse index, stored as a run of IndexEntry records."""
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
         
-        # Find the appropriate index range using binary search
-        start_offset = self._find_scan_start(key)
+        index_end = len(mm) - FOOTER_SIZE
+        if index_offset + INDEX_HEADER_SIZE > index_end:
+            raise ValueError("Invalid index: header too short")
         
-        # Scan from the start position until we find the key or exceed it
-        with open(self.filepath, 'rb') as f:
-            f.seek(start_offset)
-            
-            while f.tell() < self._data_start_pos + self._data_size:
-                try:
-                    # Read entry header to determine total size needed
-                    current_pos = f.tell()
-                    header_data = f.read(SEQUENCE_SIZE + KEY_LEN_SIZE)
-                    
-                    if len(header_data) < SEQUENCE_SIZE + KEY_LEN_SIZE:
-                        break
-                    
-                    sequence = struct.unpack(SEQUENCE_FORMAT, header_data[:SEQUENCE_SIZE])[0]
-                    key_length = struct.unpack(KEY_LENGTH_FORMAT, header_data[SEQUENCE_SIZE:])[0]
-                    
-                    # Validate key length
-                    if key_length > MAX_KEY_SIZE:
-                        raise ValueError(f"Key length {key_length} exceeds maximum {MAX_KEY_SIZE}")
-                    
-                    # Read key and value length
-                    key_and_value_len_data = f.read(key_length + VALUE_LEN_SIZE)
-                    if len(key_and_value_len_data) < key_length + VALUE_LEN_SIZE:
-                        break
-                    
-                    entry_key = key_and_value_len_data[:key_length].decode('utf-8')
-                    value_length = struct.unpack(VALUE_LENGTH_FORMAT, 
-                                                key_and_value_len_data[key_length:])[0]
-                    
-                    # Validate value length
-                    if value_length > MAX_VALUE_SIZE:
-                        raise ValueError(f"Value length {value_length} exceeds maximum {MAX_VALUE_SIZE}")
-                    
-                    # Read value if present and create appropriate entry
-                    if value_length > 0:
-                        value_data = f.read(value_length)
-                        if len(value_data) < value_length:
-                            break
-                        entry = DatabaseEntry.put(entry_key, sequence, value_data)
-                    else:
-                        entry = DatabaseEntry.delete(entry_key, sequence)
-                    
-                    # Check if we found our key
-                    if entry.key == key:
-                        return entry
-                    elif entry.key > key:
-                        # We've passed the key, it doesn't exist
-                        break
-                        
-                except (ValueError, UnicodeDecodeError):
-                    # Invalid data, we've reached the end or hit corruption
-                    break
+        entry_count = INDEX_HEADER_STRUCT.unpack_from(mm, index_offset)[0]
         
-        return None
+        keys = self._index_keys
+        offsets = self._index_offsets
+        pos = index_offset + INDEX_HEADER_SIZE
+        # keys are decoded straight out of the map through a view instead of
+        # being copied into a bytes object first; the view must be released
+        # before the map can be closed, hence the with
+        with memoryview(mm) as view:
+            for _ in range(entry_count):
+                if pos + INDEX_KEY_LEN_SIZE > index_end:
+                    raise ValueError("Unexpected end of index")
+                key_length = INDEX_KEY_LEN_STRUCT.unpack_from(mm, pos)[0]
+                key_end = pos + INDEX_KEY_LEN_SIZE + key_length
+                if key_end + INDEX_OFFSET_SIZE > index_end:
+                    raise ValueError("Unexpected end of index")
+                
+                keys.append(str(view[pos + INDEX_KEY_LEN_SIZE:key_end], 'utf-8'))
+                offsets.append(INDEX_OFFSET_STRUCT.unpack_from(mm, key_end)[0])
+                pos = key_end + INDEX_OFFSET_SIZE
+    
+    @property
+    def bloom_filter(self) -> Optional[BloomFilter]:
+        """The SSTable's bloom filter, or None if it was written without one."""
+        return self._bloom
+    
+    def might_contain(self, key: str) -> bool:
+        """Return False if the bloom filter rules the key out of this SSTable."""
+        return self._bloom is None or self._bloom.might_contain(key.encode("utf-8"))
+    
+    def get(self, key: str) -> Optional[DatabaseEntry]:
+        """Get an entry by key using sparse index for fast lookup."""
+        if not self.might_contain(key):
+            return None
+        return self.lookup(key)
+    
+    def lookup(self, key: str) -> Optional[DatabaseEntry]:
+        """get() without the bloom filter check, for callers that already did it."""
+        # Find the appropriate index range using binary search, then scan
+        # forward from there until we find the key or pass it
+        return self._scan(self._find_scan_start(key), key)
     
     def _find_scan_start(self, key: str) -> int:
         """Find the file offset to start scanning for the given key."""
-        if not self._index_entries:
+        if not self._index_keys:
             return self._data_start_pos
         
-        # Binary search to find the largest index key <= target key
-        left, right = 0, len(self._index_entries) - 1
-        start_offset = self._data_start_pos
+        idx = self._find_index_position(key)
+        if idx < 0:
+            return self._data_start_pos
         
-        while left <= right:
-            mid = (left + right) // 2
-            mid_key = self._index_entries[mid].key
-            
-            if mid_key <= key:
-                start_offset = self._index_entries[mid].file_offset
-                left = mid + 1
-            else:
-                right = mid - 1
+        return self._index_offsets[idx]
+    
+    def _find_index_position(self, key: str) -> int:
+        """
+        Find the position of the largest index key <= target key (-1 if none).
+        
+        Lookups tend to cluster (e.g. reads of recently written keys), so the
+        search gallops outward from the previous lookup's position and then
+        bisects the bracketed range, falling back to a full bisect when there
+        is no previous position.
+        """
+        keys = self._index_keys
+        count = len(keys)
+        last = self._last_index_pos
+        
+        if last < 0 or last >= count:
+            # no hint, so bisect only the bucket for the key's first character;
+            # landing on the bucket start yields the last key of earlier buckets
+            bucket = min(ord(key[0]), INDEX_BUCKET_COUNT - 1) if key else 0
+            starts = self._index_bucket_starts
+            idx = bisect.bisect_right(keys, key, starts[bucket], starts[bucket + 1]) - 1
+        elif keys[last] <= key:
+            # gallop forward; keys[lo] <= key holds throughout
+            lo, step = last, 1
+            hi = lo + step
+            while hi < count and keys[hi] <= key:
+                lo = hi
+                step <<= 1
+                hi = lo + step
+            idx = bisect.bisect_right(keys, key, lo, min(hi, count)) - 1
+        else:
+            # gallop backward; keys[hi] > key holds throughout
+            hi, step = last, 1
+            lo = hi - step
+            while lo >= 0 and keys[lo] > key:
+                hi = lo
+                step <<= 1
+                lo = hi - step
+            idx = bisect.bisect_right(keys, key, max(lo, 0), hi) - 1
         
-        return start_offset
+        self._last_index_pos = idx
+        return idx
     
-    def _linear_scan(self, key: str) -> Optional[DatabaseEntry]:
-        """Fallback linear scan when no index is available."""
-        with open(self.filepath, 'rb') as f:
-            f.seek(self._data_start_pos)
+    def _scan(self, start_offset: int, key: str) -> Optional[DatabaseEntry]:
+        """
+        Scan the data section from start_offset for key.
+        
+        Keys are compared as UTF-8 bytes (which sorts the same as the str
+        keys) straight out of the map, so an entry is only built for the
+        match. Stops early at the first larger key, and treats a truncated
+        or oversized record as the end of the data. Compressed files are
+        scanned a block at a time, starting from the block at start_offset.
+        """
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
+        
+        key_bytes = key.encode("utf-8")
+        if not self._compressed:
+            data_end = self._data_start_pos + self._data_size
+            return _scan_records(mm, start_offset, data_end, key, key_bytes)[0]
+        
+        for block in self._blocks_from(start_offset):
+            entry, done = _scan_records(block, 0, len(block), key, key_bytes)
+            if done:
+                return entry
+        return None
+    
+    def _blocks_from(self, offset: int) -> Iterator[bytes]:
+        """
+        Yield the decompressed data blocks from offset to the end of the data.
+        
+        The most recently decompressed block is kept, since clustered
+        lookups often land in the same block. A truncated or corrupt block
+        is treated as the end of the data.
+        """
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
+        
+        data_end = self._data_start_pos + self._data_size
+        while offset + BLOCK_HEADER_SIZE <= data_end:
+            raw_length, compressed_length = BLOCK_HEADER_STRUCT.unpack_from(mm, offset)
+            block_start = offset + BLOCK_HEADER_SIZE
+            block_end = block_start + compressed_length
+            if block_end > data_end:
+                return
             
-            while f.tell() < self._data_start_pos + self._data_size:
+            cached = self._block_cache
+            if cached is not None and cached[0] == offset:
+                block = cached[1]
+            else:
                 try:
-                    # Read entry header to determine total size needed
-                    current_pos = f.tell()
-                    header_data = f.read(SEQUENCE_SIZE + KEY_LEN_SIZE)
-                    
-                    if len(header_data) < SEQUENCE_SIZE + KEY_LEN_SIZE:
-                        break
-                    
-                    sequence = struct.unpack(SEQUENCE_FORMAT, header_data[:SEQUENCE_SIZE])[0]
-                    key_length = struct.unpack(KEY_LENGTH_FORMAT, header_data[SEQUENCE_SIZE:])[0]
-                    
-                    # Validate key length
-                    if key_length > MAX_KEY_SIZE:
-                        break
-                    
-                    # Read key and value length
-                    key_and_value_len_data = f.read(key_length + VALUE_LEN_SIZE)
-                    if len(key_and_value_len_data) < key_length + VALUE_LEN_SIZE:
-                        break
-                    
-                    entry_key = key_and_value_len_data[:key_length].decode('utf-8')
-                    value_length = struct.unpack(VALUE_LENGTH_FORMAT, 
-                                                key_and_value_len_data[key_length:])[0]
-                    
-                    # Validate value length
-                    if value_length > MAX_VALUE_SIZE:
-                        break
-                    
-                    # Read value if present and create appropriate entry
-                    if value_length > 0:
-                        value_data = f.read(value_length)
-                        if len(value_data) < value_length:
-                            break
-                        entry = DatabaseEntry.put(entry_key, sequence, value_data)
-                    else:
-                        entry = DatabaseEntry.delete(entry_key, sequence)
-                    
-                    if entry.key == key:
-                        return entry
-                    elif entry.key > key:
-                        break
-                        
-                except (ValueError, UnicodeDecodeError):
-                    break
+                    block = zlib.decompress(mm[block_start:block_end])
+                except zlib.error:
+                    return
+                if len(block) != raw_length:
+                    return
+                self._block_cache = (offset, block)
+            
+            yield block
+            offset = block_end
+    
+    def entries(self) -> Iterator[DatabaseEntry]:
+        """
+        Yield every entry in key order with one linear pass over the map.
         
-        return None
+        Records are parsed in place with unpack_from, so the walk needs no
+        reads. While it runs the map is advised for sequential access, so
+        the kernel reads ahead instead of faulting in one page at a time.
+        Stops at a truncated or oversized record, like _scan.
+        """
+        mm = self._mm
+        if mm is None:
+            raise RuntimeError("SSTable reader is closed")
+        
+        sequential = hasattr(mmap, "MADV_SEQUENTIAL")
+        if sequential:
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        try:
+            if not self._compressed:
+                data_end = self._data_start_pos + self._data_size
+                yield from _iter_records(mm, self._data_start_pos, data_end)
+            else:
+                for block in self._blocks_from(self._data_start_pos):
+                    yield from _iter_records(block, 0, len(block))
+        finally:
+            # back to the point lookup hint, unless the reader was closed meanwhile
+            if sequential and self._mm is not None and hasattr(mmap, "MADV_RANDOM"):
+                self._mm.madvise(mmap.MADV_RANDOM)
     
     def close(self) -> None:
         """Close the reader."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
         if self._file:
             self._file.close()
             self._file = None
\ No newline at end of file
@@ -1,9 +1,12 @@
+import logging
+import mmap
 import os
 import struct
+import threading
+import time
 import zlib
-from datetime import datetime
 from enum import Enum
-from typing import Optional, BinaryIO, Iterator
+from typing import Optional, BinaryIO, Iterable, Iterator, Tuple, Union
 
 from .entry import DatabaseEntry, EntryType
 
@@ -22,25 +25,67 @@ Write-ahead log entry format
 MAX_KEY_BYTES = 65536
 MAX_VALUE_BYTES = 1024 * 1024  # 1MB max value size, consistent with SSTable
 
+def _datasync(fd: int) -> None:
+    """
+    Flush a WAL file's data to disk.
+
+    fdatasync where available: replay needs the appended bytes and the file
+    size to be durable, not metadata like the mtime, so this skips the extra
+    journal work of a full fsync. close() still does a full fsync.
+    """
+    if hasattr(os, "fdatasync"):
+        os.fdatasync(fd)
+    else:
+        os.fsync(fd)
+
+
 class WALOperationType(Enum):
     PUT = 1
     DELETE = 2
     FLUSH = 3
 
 
+# raw operation type values, used on the serialize/deserialize paths so they
+# never go through an Enum lookup; the Enum is built only when asked for
+_PUT = WALOperationType.PUT.value
+_DELETE = WALOperationType.DELETE.value
+_FLUSH = WALOperationType.FLUSH.value
+_OP_TYPES = {op_type.value: op_type for op_type in WALOperationType}
+
+
 class WALEntry:
     HEADER_FORMAT = "!IQQBII"  # ! for network byte order, I=uint32, Q=uint64, B=uint8
     HEADER_FORMAT_SANS_CRC = "!QQBII"  # sequence, timestamp, op_type, key_len, value_len
     HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
 
+    # precompiled so the format strings are parsed once, not per entry
+    HEADER_STRUCT = struct.Struct(HEADER_FORMAT)
+    _CRC_STRUCT = struct.Struct("!I")
+    _HEADER_SANS_CRC_STRUCT = struct.Struct(HEADER_FORMAT_SANS_CRC)
+    # zero-filled space appended for the header, which is then packed in place
+    _HEADER_PLACEHOLDER = bytes(HEADER_SIZE)
+
+    __slots__ = ('_timestamp', '_op_type', '_key', '_value', '_sequence')
+
     def __init__(self, timestamp: int, op_type: WALOperationType,
                  key: str, sequence: int, value: bytes = b''):
+        self._init(timestamp, op_type.value, key, sequence, value)
+
+    def _init(self, timestamp: int, op_type: int, key: str, sequence: int, value: bytes) -> None:
         self._timestamp = timestamp
-        self._op_type = op_type
+        self._op_type = op_type  # raw value, see op_type for the Enum
         self._key = key
         self._value = value
         self._sequence = sequence
 
+    @classmethod
+    def _from_fields(cls, timestamp: int, op_type: int, key: str, sequence: int,
+                     value: bytes) -> 'WALEntry':
+        """Build an entry from an already validated raw operation type."""
+        entry = cls.__new__(cls)
+        entry._init(timestamp, op_type, key, sequence, value)
+        return entry
+
     @classmethod
     def put(cls, timestamp: int, key: str, value: bytes, sequence: int) -> 'WALEntry':
         return cls(timestamp, WALOperationType.PUT, key, sequence, value)
@@ -59,7 +104,7 @@ class WALEntry:
         """Create a WALEntry from a unified DatabaseEntry."""
         # Use DatabaseEntry's timestamp if provided, otherwise use parameter or current time
         if timestamp is None:
-            timestamp = entry.timestamp if entry.timestamp is not None else int(datetime.utcnow().timestamp())
+            timestamp = entry.timestamp if entry.timestamp is not None else int(time.time())
         
         if entry.entry_type == EntryType.PUT:
             if entry.value is None:
@@ -70,9 +115,9 @@ class WALEntry:
     
     def to_database_entry(self) -> DatabaseEntry:
         """Convert this WALEntry to a unified DatabaseEntry."""
-        if self.op_type == WALOperationType.PUT:
+        if self._op_type == _PUT:
             return DatabaseEntry.put(self.key, self.sequence, self.value, self.timestamp)
-        elif self.op_type == WALOperationType.DELETE:
+        elif self._op_type == _DELETE:
             return DatabaseEntry.delete(self.key, self.sequence, self.timestamp)
         else:
             # FLUSH operations cannot be converted to DatabaseEntry since they're WAL-specific
@@ -84,7 +129,7 @@ class WALEntry:
 
     @property
     def op_type(self) -> WALOperationType:
-        return self._op_type
+        return _OP_TYPES[self._op_type]
 
     @property
     def key(self) -> str:
@@ -100,7 +145,7 @@ class WALEntry:
 
     def is_flush_marker(self) -> bool:
         """Check if this entry is a flush marker."""
-        return self.op_type == WALOperationType.FLUSH
+        return self._op_type == _FLUSH
 
     def get_flushed_sstable_id(self) -> Optional[str]:
         """
@@ -118,82 +163,94 @@ class WALEntry:
         return None
 
     def serialize(self) -> bytes:
-        key_bytes = self.key.encode("utf-8")
-        value_bytes = self.value
-
-        # does not include CRC
-        raw_header = struct.pack(
-            self.HEADER_FORMAT_SANS_CRC,
-            self.sequence,
-            self.timestamp,
-            self.op_type.value,
-            len(key_bytes),
-            len(value_bytes)
-        )
+        return self.serialize_record(self.sequence, self.timestamp, self._op_type,
+                                     self.key.encode("utf-8"), self.value)
+
+    @classmethod
+    def serialize_record(cls, sequence: int, timestamp: int, op_type: int,
+                         key_bytes: bytes, value_bytes: bytes) -> bytes:
+        """Serialize a record from its fields, taking the key already encoded."""
+        buf = bytearray()
+        cls.serialize_record_into(buf, sequence, timestamp, op_type, key_bytes, value_bytes)
+        return bytes(buf)
 
-        # calculate CRC of header (minus CRC field) + data
-        data_to_crc = raw_header + key_bytes + value_bytes
-        crc = zlib.crc32(data_to_crc)
-
-        # now pack the entire header
-        header = struct.pack(
-            self.HEADER_FORMAT,
-            crc,
-            self.sequence,
-            self.timestamp,
-            self.op_type.value,
+    @classmethod
+    def serialize_record_into(cls, buf: bytearray, sequence: int, timestamp: int,
+                              op_type: int, key_bytes: bytes,
+                              value_bytes: bytes) -> int:
+        """
+        Append a serialized record to buf, returning the number of bytes added.
+
+        Lets the log gather any number of records into one buffer with no
+        per-record bytes objects or join copies. op_type is the raw
+        WALOperationType value.
+        """
+        start = len(buf)
+        crc_size = cls._CRC_STRUCT.size
+
+        # header (minus CRC) first, then key and value, then fill in the CRC
+        # over everything after it
+        buf += cls._HEADER_PLACEHOLDER
+        cls._HEADER_SANS_CRC_STRUCT.pack_into(
+            buf,
+            start + crc_size,
+            sequence,
+            timestamp,
+            op_type,
             len(key_bytes),
             len(value_bytes)
         )
+        buf += key_bytes
+        buf += value_bytes
 
-        return header + key_bytes + value_bytes
+        # the view must be released before buf can be resized again
+        with memoryview(buf) as view:
+            crc = zlib.crc32(view[start + crc_size:])
+        cls._CRC_STRUCT.pack_into(buf, start, crc)
+
+        return len(buf) - start
 
     @classmethod
-    def deserialize(cls, data: bytes) -> 'WALEntry':
+    def deserialize(cls, data: Union[bytes, bytearray, memoryview]) -> 'WALEntry':
+        """
+        Parse and verify one record from the start of data.
+
+        data may be a view into a larger buffer (e.g. a mapped WAL file); the
+        CRC and key are read through it and only the value is copied out.
+        """
         if len(data) < cls.HEADER_SIZE:
             raise ValueError(f"Data too short for header: {len(data)} < {cls.HEADER_SIZE}")
 
-        header = data[:cls.HEADER_SIZE]
-        src_crc, sequence, timestamp, op_type_value, key_len, value_len = struct.unpack(cls.HEADER_FORMAT, header)
+        src_crc, sequence, timestamp, op_type_value, key_len, value_len = cls.HEADER_STRUCT.unpack_from(data)
 
         expected_len = cls.HEADER_SIZE + key_len + value_len
         if len(data) < expected_len:
             raise ValueError(f"Data too short for payload: {len(data)} < {expected_len}")
 
-        # unpack the raw data (minus crc) to verify
-        data_to_verify = struct.pack(
-            cls.HEADER_FORMAT_SANS_CRC,
-            sequence,
-            timestamp,
-            op_type_value,
-            key_len,
-            value_len
-        )
         payload_offset = cls.HEADER_SIZE
         key_end_offset = payload_offset + key_len
-        key_bytes = data[payload_offset:key_end_offset]
-        value_bytes = data[key_end_offset:key_end_offset + value_len]
 
-        read_crc = zlib.crc32(data_to_verify + key_bytes + value_bytes)
-        if src_crc != read_crc:
-            raise ValueError("CRC check failed")
+        with memoryview(data) as view:
+            # the CRC covers everything after itself, which is one
+            # contiguous run of the input, so it's checked with no copies
+            read_crc = zlib.crc32(view[cls._CRC_STRUCT.size:expected_len])
+            if src_crc != read_crc:
+                raise ValueError("CRC check failed")
 
-        try:
-            op_type = WALOperationType(op_type_value)
-        except ValueError:
-            raise ValueError(f"Invalid operation type: {op_type_value}")
+            if op_type_value not in _OP_TYPES:
+                raise ValueError(f"Invalid operation type: {op_type_value}")
 
-        try:
-            key = key_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            raise ValueError("Invalid UTF-8 encoding in key")
+            try:
+                key = str(view[payload_offset:key_end_offset], "utf-8")
+            except UnicodeDecodeError:
+                raise ValueError("Invalid UTF-8 encoding in key")
 
-        if op_type == WALOperationType.DELETE:
-            return cls.delete(timestamp, key, sequence)
-        elif op_type == WALOperationType.PUT:
-            return cls.put(timestamp, key, value_bytes, sequence)
-        else:  # WALOperationType.FLUSH
-            return cls(timestamp=timestamp, op_type=WALOperationType.FLUSH, key=key, sequence=sequence, value=b'')
+            value_bytes = view[key_end_offset:expected_len].tobytes() if op_type_value == _PUT else b''
+
+        if op_type_value == _PUT:
+            return cls._from_fields(timestamp, _PUT, key, sequence, value_bytes)
+        # DELETE and FLUSH records carry no value
+        return cls._from_fields(timestamp, op_type_value, key, sequence, b'')
 
 
 class WriteAheadLog:
@@ -205,6 +262,14 @@ class WriteAheadLog:
         self.write_position = 0
         self.file_counter = 0
 
+        # group commit state: writers append under the condition's lock and
+        # then wait until a single fsync covers their record. LSNs count bytes
+        # appended across all files so they keep increasing through rotation.
+        self._commit_cond = threading.Condition()
+        self._written_lsn = 0
+        self._synced_lsn = 0
+        self._sync_in_progress = False
+
         # create directory if it doesn't exist
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
@@ -215,7 +280,7 @@ class WriteAheadLog:
 
     def _get_timestamped_path(self) -> str:
         """Generate timestamp-based WAL file path."""
-        timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        timestamp = time.strftime('%Y%m%d%H%M%S', time.gmtime())
         path = f"{self.base_path}.{timestamp}.{self.file_counter}"
         self.file_counter += 1
         return path
@@ -253,16 +318,39 @@ class WriteAheadLog:
 
         return old_path
 
+    def start_new_file(self) -> str:
+        """
+        Switch writes to a new WAL file without writing a flush marker.
+
+        Used when the memtable is handed off to a background flush: the old
+        file then holds exactly that memtable's entries, and is marked with
+        append_flush_marker once its SSTable has been written.
+
+        Returns:
+            str: Path of the old WAL file
+        """
+        old_path = self.current_path
+        self._open_next_file()
+        return old_path
+
     def close(self) -> None:
         """Safely close the WAL file."""
-        if self.write_file:
-            self.write_file.flush()
-            os.fsync(self.write_file.fileno())
-            self.write_file.close()
-            self.write_file = None
-        if self.read_file:
-            self.read_file.close()
-            self.read_file = None
+        with self._commit_cond:
+            # let an in-flight group commit finish before pulling the file away
+            while self._sync_in_progress:
+                self._commit_cond.wait()
+
+            if self.write_file:
+                self.write_file.flush()
+                os.fsync(self.write_file.fileno())
+                self.write_file.close()
+                self.write_file = None
+            if self.read_file:
+                self.read_file.close()
+                self.read_file = None
+
+            self._synced_lsn = self._written_lsn
+            self._commit_cond.notify_all()
 
     def __enter__(self) -> 'WriteAheadLog':
         return self
@@ -270,12 +358,18 @@ class WriteAheadLog:
     def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception], exc_tb: Optional[object]) -> None:
         self.close()
 
-    def write_to_log(self, entry: DatabaseEntry) -> int:
+    def write_to_log(self, entry: DatabaseEntry, sync: bool = True) -> int:
         """
         Write a unified DatabaseEntry to the WAL.
 
+        Concurrent writers share fsyncs: whichever caller syncs first makes
+        every record appended before it durable, and the others just wait.
+
         Args:
             entry: DatabaseEntry instance to write.
+            sync: If False, return once the record is appended without waiting
+                  for it to reach disk. It becomes durable at the next synced
+                  write, sync() or close().
 
         Returns:
             int: Byte offset where the entry was written.
@@ -285,32 +379,66 @@ class WriteAheadLog:
             ValueError: If the entry violates WAL size constraints.
             IOError:   If the underlying file write fails.
         """
-        if not self.write_file:
-            raise RuntimeError('WAL file not available!')
+        buf = bytearray()
+        self._serialize_entry_into(buf, entry)
+        current_position, lsn = self._append(buf)
+        if sync:
+            self._sync_through(lsn)
+
+        return current_position
+
+    def write_batch(self, entries: Iterable[DatabaseEntry], sync: bool = True) -> int:
+        """
+        Write several DatabaseEntries to the WAL as one append.
+
+        Every entry is validated and serialized before anything is written, so
+        an invalid entry rejects the whole batch. The records are then written
+        back to back with a single write and (if sync) a single fsync. On disk
+        they are ordinary records, so replay needs no special handling.
 
+        Returns:
+            int: Byte offset where the first entry was written.
+
+        Raises:
+            Same as write_to_log.
+        """
+        # every record is serialized straight into one buffer, which then
+        # goes to the file as is
+        serialized = bytearray()
+        for entry in entries:
+            self._serialize_entry_into(serialized, entry)
+
+        current_position, lsn = self._append(serialized)
+        if sync:
+            self._sync_through(lsn)
+
+        return current_position
+
+    @staticmethod
+    def _serialize_entry_into(buf: bytearray, entry: DatabaseEntry) -> None:
+        """Validate a DatabaseEntry against the WAL limits and append its record to buf."""
         # Validate key/value size constraints that are WAL-specific
-        if len(entry.key.encode()) > MAX_KEY_BYTES:
+        if len(entry.key_bytes) > MAX_KEY_BYTES:
             raise ValueError('key exceeds max size')
 
         if entry.entry_type == EntryType.PUT and entry.value is not None:
             if len(entry.value) > MAX_VALUE_BYTES:
                 raise ValueError(f'value exceeds max size of {MAX_VALUE_BYTES} bytes')
 
-        # Convert to a WALEntry (adds timestamp if missing)
-        wal_entry = WALEntry.from_database_entry(entry)
-
-        serialized_entry = wal_entry.serialize()
-        current_position = self.write_position
-        bytes_written = self.write_file.write(serialized_entry)
-        self.write_position = current_position + bytes_written
-
-        try:
-            self.write_file.flush()
-            os.fsync(self.write_file.fileno())
-        except (OSError, ValueError) as e:
-            raise IOError from e
+        # Serialize straight from the entry, reusing its encoded key rather
+        # than building a WALEntry and encoding the key again
+        timestamp = entry.timestamp
+        if timestamp is None:
+            timestamp = int(time.time())
 
-        return current_position
+        if entry.entry_type == EntryType.PUT:
+            if entry.value is None:
+                raise ValueError("PUT entries must have a value")
+            WALEntry.serialize_record_into(buf, entry.sequence, timestamp, _PUT,
+                                           entry.key_bytes, entry.value)
+        else:
+            WALEntry.serialize_record_into(buf, entry.sequence, timestamp, _DELETE,
+                                           entry.key_bytes, b'')
 
     def write_flush_marker(self, sstable_id: str, sequence: int) -> int:
         """
@@ -323,31 +451,98 @@ class WriteAheadLog:
         Returns:
             int: Byte offset where the flush marker was written
         """
-        if not self.write_file:
-            raise RuntimeError('WAL file not available!')
+        flush_entry = self._flush_marker_entry(sstable_id, sequence)
         
+        current_position, lsn = self._append(flush_entry.serialize())
+        self._sync_through(lsn)
+
+        return current_position
+
+    @staticmethod
+    def append_flush_marker(file_path: str, sstable_id: str, sequence: int) -> None:
+        """
+        Durably append a flush marker to a WAL file that is no longer being written.
+        
+        Args:
+            file_path: WAL file the flushed entries were logged to
+            sstable_id: ID of the SSTable that was flushed
+            sequence: Sequence number for the flush marker
+        """
+        flush_entry = WriteAheadLog._flush_marker_entry(sstable_id, sequence)
+        with open(file_path, 'ab') as file:
+            file.write(flush_entry.serialize())
+            file.flush()
+            _datasync(file.fileno())
+
+    @staticmethod
+    def _flush_marker_entry(sstable_id: str, sequence: int) -> WALEntry:
         # Create flush marker entry with the SSTable ID in the key
-        timestamp = int(datetime.utcnow().timestamp())
-        flush_entry = WALEntry(
+        timestamp = int(time.time())
+        return WALEntry(
             timestamp=timestamp, 
             op_type=WALOperationType.FLUSH,
             key=f"FLUSH:{sstable_id}", 
             sequence=sequence, 
             value=b''
         )
-        
-        serialized_entry = flush_entry.serialize()
-        current_position = self.write_position
-        bytes_written = self.write_file.write(serialized_entry)
-        self.write_position = current_position + bytes_written
 
-        try:
-            self.write_file.flush()
-            os.fsync(self.write_file.fileno())
-        except (OSError, ValueError) as e:
-            raise IOError from e
+    def sync(self) -> None:
+        """Make every record appended so far durable."""
+        with self._commit_cond:
+            lsn = self._written_lsn
+        self._sync_through(lsn)
 
-        return current_position
+    def _append(self, serialized_entry: Union[bytes, bytearray]) -> Tuple[int, int]:
+        """
+        Append a serialized record to the current file without syncing.
+
+        Returns:
+            tuple: (byte offset in the current file, LSN just past the record)
+        """
+        with self._commit_cond:
+            if not self.write_file:
+                raise RuntimeError('WAL file not available!')
+
+            current_position = self.write_position
+            bytes_written = self.write_file.write(serialized_entry)
+            self.write_position = current_position + bytes_written
+            self._written_lsn += bytes_written
+            return current_position, self._written_lsn
+
+    def _sync_through(self, lsn: int) -> None:
+        """
+        Block until every record up to the given LSN is on disk.
+
+        If no sync is running, this caller becomes the leader and fsyncs on
+        behalf of everything appended so far; otherwise it waits for the
+        running sync and re-checks, since that sync may already cover it.
+        """
+        cond = self._commit_cond
+        with cond:
+            while self._synced_lsn < lsn:
+                if self._sync_in_progress:
+                    cond.wait()
+                    continue
+                if not self.write_file:
+                    raise RuntimeError('WAL file not available!')
+
+                write_file = self.write_file
+                target_lsn = self._written_lsn
+                self._sync_in_progress = True
+                try:
+                    write_file.flush()
+                    # other writers can keep appending while we wait on the disk
+                    cond.release()
+                    try:
+                        _datasync(write_file.fileno())
+                    finally:
+                        cond.acquire()
+                    self._synced_lsn = max(self._synced_lsn, target_lsn)
+                except (OSError, ValueError) as e:
+                    raise IOError from e
+                finally:
+                    self._sync_in_progress = False
+                    cond.notify_all()
 
     def read_log_entry(self, position: Optional[int] = None) -> Optional[WALEntry]:
         """
@@ -379,7 +574,7 @@ class WriteAheadLog:
             raise ValueError("Incomplete header")
 
         # unpack the header (and the values we care about)
-        _, _, _, _, key_len, value_len = struct.unpack(WALEntry.HEADER_FORMAT, header_bytes)
+        _, _, _, _, key_len, value_len = WALEntry.HEADER_STRUCT.unpack(header_bytes)
         bytes_to_read = key_len + value_len
         payload_bytes = self.read_file.read(bytes_to_read)
 
@@ -403,102 +598,153 @@ class WriteAheadLog:
         Yields:
             WALEntry: Valid entries from the WAL file
         """
-        import logging
         logger = logging.getLogger("sprucedb.wal.replay")
         
         try:
             with open(file_path, 'rb') as file:
-                position = 0
-                entry_count = 0
-                corruption_count = 0
-                
-                while True:
-                    try:
-                        file.seek(position)
-                        
-                        # Try to read header
-                        header_bytes = file.read(WALEntry.HEADER_SIZE)
-                        if not header_bytes:
-                            break  # EOF
-                        
-                        if len(header_bytes) < WALEntry.HEADER_SIZE:
-                            logger.warning("Incomplete header at position %d in %s, stopping replay", 
-                                         position, file_path)
-                            break
-                        
-                        # Extract payload size from header
-                        _, _, _, _, key_len, value_len = struct.unpack(WALEntry.HEADER_FORMAT, header_bytes)
-                        
-                        # Read payload
-                        payload_size = key_len + value_len
-                        payload_bytes = file.read(payload_size)
-                        
-                        if len(payload_bytes) < payload_size:
-                            logger.warning("Incomplete payload at position %d in %s, stopping replay", 
-                                         position, file_path)
-                            break
-                        
-                        # Try to deserialize complete entry
-                        entry_data = header_bytes + payload_bytes
-                        entry = WALEntry.deserialize(entry_data)
-                        
-                        yield entry
-                        entry_count += 1
-                        position += len(entry_data)
-                        
-                    except ValueError as e:
-                        corruption_count += 1
-                        logger.warning("Corrupted entry at position %d in %s: %s", 
-                                     position, file_path, e)
-                        
-                        # Try to find the next valid entry by scanning ahead
-                        position += 1
-                        if position >= os.path.getsize(file_path):
-                            break
-                            
-                    except Exception as e:
-                        logger.error("Unexpected error reading WAL file %s at position %d: %s", 
-                                   file_path, position, e)
-                        break
+                file_size = os.fstat(file.fileno()).st_size
+                if file_size == 0:
+                    logger.info("WAL replay from %s: 0 entries read, 0 corruptions skipped", file_path)
+                    return
                 
-                logger.info("WAL replay from %s: %d entries read, %d corruptions skipped", 
-                           file_path, entry_count, corruption_count)
+                # map the whole file once; records are parsed in place rather
+                # than with a seek + two reads each
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield from WriteAheadLog._read_mapped_entries(mm, file_size, file_path, logger)
                            
         except OSError as e:
             logger.error("Failed to open WAL file %s for replay: %s", file_path, e)
             # Don't yield anything if we can't open the file
             return
 
+    @staticmethod
+    def _read_mapped_entries(mm: mmap.mmap, file_size: int, file_path: str,
+                             logger: logging.Logger) -> Iterator[WALEntry]:
+        """read_all_entries() over an already mapped WAL file."""
+        header_struct = WALEntry.HEADER_STRUCT
+        header_size = WALEntry.HEADER_SIZE
+        position = 0
+        entry_count = 0
+        corruption_count = 0
+        
+        # records are handed to deserialize as views into the map, so only
+        # their values are copied; the with releases the view before the
+        # caller closes the map, even if this generator is abandoned
+        with memoryview(mm) as view:
+            while position < file_size:
+                try:
+                    if position + header_size > file_size:
+                        logger.warning("Incomplete header at position %d in %s, stopping replay", 
+                                     position, file_path)
+                        break
+                
+                    # Extract payload size from header
+                    _, _, _, _, key_len, value_len = header_struct.unpack_from(view, position)
+                
+                    entry_end = position + header_size + key_len + value_len
+                    if entry_end > file_size:
+                        logger.warning("Incomplete payload at position %d in %s, stopping replay", 
+                                     position, file_path)
+                        break
+                
+                    # Try to deserialize complete entry
+                    entry = WALEntry.deserialize(view[position:entry_end])
+                
+                    yield entry
+                    entry_count += 1
+                    position = entry_end
+                
+                except ValueError as e:
+                    corruption_count += 1
+                    logger.warning("Corrupted entry at position %d in %s: %s", 
+                                 position, file_path, e)
+                
+                    # Try to find the next valid entry by scanning ahead
+                    position += 1
+                    
+                except Exception as e:
+                    logger.error("Unexpected error reading WAL file %s at position %d: %s", 
+                               file_path, position, e)
+                    break
+        
+        logger.info("WAL replay from %s: %d entries read, %d corruptions skipped", 
+                   file_path, entry_count, corruption_count)
+
     @staticmethod
     def has_flush_marker_at_end(file_path: str) -> bool:
+        """Check if a WAL file ends with a FLUSH marker."""
+        return WriteAheadLog.read_flush_marker_at_end(file_path) is not None
+
+    @staticmethod
+    def read_flush_marker_at_end(file_path: str) -> Optional[WALEntry]:
         """
-        Check if a WAL file ends with a FLUSH marker.
+        Return the FLUSH marker a WAL file ends with, or None if it doesn't.
         
-        This method uses read_all_entries logic to sequentially
-        read through the file and check the last valid entry.
-        Could be optimized to not read the entire file, but this
-        works for now.
+        Record boundaries are found by walking the headers forward from the
+        start of the file, without decoding payloads, so only the last whole
+        record is verified. A FLUSH-shaped run of bytes inside a value can
+        never be mistaken for the marker. Only if the headers don't chain
+        exactly to EOF (a torn write or corruption) does this fall back to
+        reading the whole file and checking its last valid entry.
         """
-        import logging
         logger = logging.getLogger("sprucedb.wal.check")
         
         try:
-            entries = list(WriteAheadLog.read_all_entries(file_path))
-            
-            if not entries:
-                return False  # Empty file has no FLUSH marker
+            marker: Optional[WALEntry] = None
+            last_start: Optional[int] = None
+            with open(file_path, 'rb') as file:
+                file_size = os.fstat(file.fileno()).st_size
+                if file_size == 0:
+                    return None
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    last_start = WriteAheadLog._find_last_record_start(mm, file_size)
+                    if last_start is not None:
+                        try:
+                            final_entry = WALEntry.deserialize(mm[last_start:file_size])
+                        except ValueError:
+                            last_start = None
+                        else:
+                            if final_entry.is_flush_marker():
+                                marker = final_entry
             
-            # Check if the last valid entry is a FLUSH marker
-            last_entry = entries[-1]
-            is_flush = last_entry.is_flush_marker()
+            if last_start is None:
+                last_entry = None
+                for last_entry in WriteAheadLog.read_all_entries(file_path):
+                    pass
+                if last_entry is not None and last_entry.is_flush_marker():
+                    marker = last_entry
             
-            if is_flush:
+            if marker is not None:
                 logger.debug("WAL file %s ends with FLUSH marker (SSTable: %s)", 
-                           file_path, last_entry.get_flushed_sstable_id())
+                           file_path, marker.get_flushed_sstable_id())
             
-            return is_flush
+            return marker
             
         except Exception as e:
             logger.warning("Error checking for FLUSH marker in %s: %s", file_path, e)
             # If we can't determine, assume it needs replay (safer default)
-            return False
+            return None
+
+    @staticmethod
+    def _find_last_record_start(mm: mmap.mmap, file_size: int) -> Optional[int]:
+        """
+        Walk record headers from offset 0 and return where the last record starts.
+        
+        Returns None unless the records chain exactly to file_size with
+        in-limit lengths; payloads and CRCs are not checked here.
+        """
+        header_struct = WALEntry.HEADER_STRUCT
+        header_size = WALEntry.HEADER_SIZE
+        position = 0
+        last_start = None
+        
+        while position < file_size:
+            if position + header_size > file_size:
+                return None
+            _, _, _, _, key_len, value_len = header_struct.unpack_from(mm, position)
+            if key_len > MAX_KEY_BYTES or value_len > MAX_VALUE_BYTES:
+                return None
+            last_start = position
+            position += header_size + key_len + value_len
+        
+        return last_start if position == file_size else None
@@ -0,0 +1,56 @@
+import pytest
+
+from src.bloom import BloomFilter, MIN_BITS
+
+
+def test_added_keys_are_always_found() -> None:
+    """Test that a bloom filter never gives false negatives."""
+    bloom = BloomFilter.for_capacity(1000)
+    keys = [f"key{i}".encode() for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    for key in keys:
+        assert bloom.might_contain(key)
+
+
+def test_false_positive_rate() -> None:
+    """Test that the default sizing keeps false positives around 1%."""
+    bloom = BloomFilter.for_capacity(1000)
+    for i in range(1000):
+        bloom.add(f"key{i}".encode())
+
+    false_positives = sum(1 for i in range(10000) if bloom.might_contain(f"missing{i}".encode()))
+    assert false_positives < 300  # ~1% expected, allow generous slack
+
+
+def test_empty_filter() -> None:
+    """Test that an empty filter rejects everything and still has a minimum size."""
+    bloom = BloomFilter.for_capacity(0)
+    assert bloom.num_bits == MIN_BITS
+    assert not bloom.might_contain(b"anything")
+
+
+def test_serialization_round_trip() -> None:
+    """Test serializing and deserializing a bloom filter."""
+    bloom = BloomFilter.for_capacity(50)
+    for i in range(50):
+        bloom.add(f"key{i}".encode())
+
+    restored = BloomFilter.deserialize(bloom.serialize())
+    assert restored.num_bits == bloom.num_bits
+    assert restored.num_hashes == bloom.num_hashes
+    for i in range(50):
+        assert restored.might_contain(f"key{i}".encode())
+
+
+def test_deserialize_truncated_data() -> None:
+    """Test that truncated filter data is rejected."""
+    bloom = BloomFilter.for_capacity(50)
+    data = bloom.serialize()
+
+    with pytest.raises(ValueError):
+        BloomFilter.deserialize(data[:4])
+
+    with pytest.raises(ValueError):
+        BloomFilter.deserialize(data[:-1])
@@ -0,0 +1,21 @@
+import logging
+
+from src.configuration import Configuration
+
+
+def test_repeated_configuration_keeps_logging_handlers() -> None:
+    Configuration()
+    handlers = list(logging.getLogger("sprucedb").handlers)
+
+    Configuration()
+    assert logging.getLogger("sprucedb").handlers == handlers
+
+
+def test_reconfigure_logging_rebuilds_handlers() -> None:
+    config = Configuration()
+    handlers = list(logging.getLogger("sprucedb").handlers)
+
+    config.reconfigure_logging()
+    new_handlers = logging.getLogger("sprucedb").handlers
+    assert len(new_handlers) == len(handlers)
+    assert all(h not in handlers for h in new_handlers)
@@ -1,10 +1,13 @@
 import tempfile
+import threading
 import pytest
 from pathlib import Path
 
 from src.database import Database
 from src.configuration import Configuration
 from src.entry import EntryType, DatabaseEntry
+from src.sstable import SSTableReader, SSTableWriter
+from src.wal import WALEntry, WriteAheadLog
 
 
 def test_put_basic_operation() -> None:
@@ -455,6 +458,25 @@ def test_wal_replay_basic_recovery() -> None:
         
         db2.close()
 
+def test_wal_replay_ignores_flush_marker_bytes_in_a_value() -> None:
+    """A value that ends like a FLUSH record must not cause its WAL file to be skipped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        db1 = Database(config)
+        
+        fake_marker = WALEntry.flush(1700000000, 1).serialize()
+        db1.put("important", b"data")
+        db1.put("blob", b"payload" + fake_marker)
+        db1.close()
+        
+        db2 = Database(config)
+        assert db2.get("important") == b"data"
+        assert db2.get("blob") == b"payload" + fake_marker
+        assert db2.seq_no == 2
+        db2.close()
+
+
 def test_wal_replay_sequence_continuity() -> None:
     """Test that sequence numbers continue correctly after recovery."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -675,4 +697,331 @@ def test_wal_replay_corruption_resilience() -> None:
         db2.put("new_after_recovery", b"new_data")
         assert db2.get("new_after_recovery") == b"new_data"
         
-        db2.close() 
\ No newline at end of file
+        db2.close() 
+
+
+def test_get_after_flush_reads_sstables() -> None:
+    """Test that flushed data is found in SSTables, including across restarts."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 100  # Small threshold to force flushes
+        
+        db1 = Database(config)
+        for i in range(20):
+            db1.put(f"key{i:03d}", f"value{i}".encode())
+        db1.delete("key005")
+        
+        # SSTables are written inside the sstables directory
+        sst_files = list((Path(tmpdir) / "sstables").iterdir())
+        assert len(sst_files) > 1
+        
+        for i in range(20):
+            expected = None if i == 5 else f"value{i}".encode()
+            assert db1.get(f"key{i:03d}") == expected
+        assert db1.get("missing") is None
+        db1.close()
+        
+        db2 = Database(config)
+        for i in range(20):
+            expected = None if i == 5 else f"value{i}".encode()
+            assert db2.get(f"key{i:03d}") == expected
+        db2.close()
+
+
+def test_put_batch_applies_in_order_and_replays() -> None:
+    """Test that a batch is logged as ordinary WAL records and applied in order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+
+        db1 = Database(config)
+        db1.put_batch([("a", b"1"), ("b", b"2"), ("a", b"3")])
+        assert db1.seq_no == 3
+        assert db1.get("a") == b"3"
+        assert db1.get("b") == b"2"
+        db1.close()
+
+        db2 = Database(config)
+        assert db2.seq_no == 3
+        assert db2.get("a") == b"3"
+        assert db2.get("b") == b"2"
+        db2.close()
+
+
+def test_put_batch_rejects_whole_batch_on_invalid_entry() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        db = Database(config)
+
+        position = db.wal.write_position
+        with pytest.raises(ValueError, match="value exceeds max size"):
+            db.put_batch([("ok", b"1"), ("too_big", b"x" * (1024 * 1024 + 1))])
+
+        assert db.wal.write_position == position
+        assert db.get("ok") is None
+        db.close()
+
+
+def test_sstable_list_tracks_flushes() -> None:
+    """Test that the cached SSTable list stays in step with the directory, newest first."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 100
+
+        db1 = Database(config)
+        for i in range(20):
+            db1.put(f"key{i:03d}", b"value")
+        db1._wait_for_flush()
+
+        on_disk = sorted((Path(tmpdir) / "sstables").iterdir(), reverse=True)
+        assert len(on_disk) > 1
+        assert db1._sst_files == on_disk
+        db1.close()
+
+        db2 = Database(config)
+        assert db2._sst_files == on_disk
+        db2.close()
+
+
+def test_sstable_readers_are_cached_and_bounded() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 100
+        config.sstable_reader_cache_size = 2
+
+        db = Database(config)
+        for i in range(20):
+            db.put(f"key{i:03d}", f"value{i}".encode())
+        assert len(db._sst_files) > 2
+
+        # reads spread over every SSTable, but only the most recent readers stay open
+        for i in range(20):
+            assert db.get(f"key{i:03d}") == f"value{i}".encode()
+        assert len(db._reader_cache) == 2
+
+        reader = next(iter(db._reader_cache.values()))
+        db.close()
+        assert not db._reader_cache
+        assert reader._mm is None
+
+
+def test_bloom_cache_skips_sstables_without_opening_them() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 100
+
+        db1 = Database(config)
+        for i in range(20):
+            db1.put(f"key{i:03d}", b"value")
+        assert len(db1._sst_files) > 1
+
+        # filters are registered at flush time, so misses never open a reader
+        assert all(db1._bloom_cache.get(path) is not None for path in db1._sst_files)
+        for i in range(50):
+            assert db1.get(f"missing{i}") is None
+        assert not db1._reader_cache
+        db1.close()
+
+        # after a restart the filters are picked up as readers get opened
+        db2 = Database(config)
+        assert not db2._bloom_cache
+        assert db2.get("key000") == b"value"
+        assert db2._bloom_cache
+        db2.close()
+
+
+def test_wal_files_in_same_second_sort_by_counter() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        db = Database(config)
+        db.close()
+
+        wal_dir = Path(tmpdir) / "wal"
+        for path in wal_dir.iterdir():
+            path.unlink()
+        for name in ["current.wal.20240101120000.10", "current.wal.20240101120000.2",
+                     "current.wal.20231231235959.7"]:
+            (wal_dir / name).touch()
+
+        names = [p.name for p in db._discover_wal_files()]
+        assert names == ["current.wal.20231231235959.7", "current.wal.20240101120000.2",
+                         "current.wal.20240101120000.10"]
+
+
+def test_parallel_sstable_search_returns_newest_version() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 150
+        config.sstable_read_parallelism = 4
+
+        db = Database(config)
+        # every round rewrites the same keys, so each key lives in many SSTables
+        for round_no in range(5):
+            for i in range(10):
+                db.put(f"key{i}", f"r{round_no}".encode())
+        db.delete("key3")
+        db._flush_memtable_to_sstable()
+        assert len(db._sst_files) > 4
+
+        for i in range(10):
+            assert db.get(f"key{i}") == (None if i == 3 else b"r4")
+        assert db.get("missing") is None
+
+        db.close()
+        assert db._read_executor is None
+
+
+def test_writes_and_reads_continue_during_background_flush(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 1000
+
+        # hold the flush thread inside finalize until released
+        release = threading.Event()
+        original_finalize = SSTableWriter.finalize
+
+        def blocking_finalize(self: SSTableWriter) -> None:
+            release.wait(timeout=10)
+            original_finalize(self)
+
+        monkeypatch.setattr(SSTableWriter, "finalize", blocking_finalize)
+
+        db1 = Database(config)
+        first_wal = db1.wal.current_path
+        for i in range(100):
+            db1.put(f"key{i:03d}", b"value")
+            if db1._flush_future is not None:
+                break
+
+        # the put that tripped the threshold returned with the flush still running
+        assert db1._flush_future is not None and not db1._flush_future.done()
+        assert db1.wal.current_path != first_wal
+        db1.put("during_flush", b"new")
+        assert db1.get("key000") == b"value"
+        assert db1.get("during_flush") == b"new"
+
+        release.set()
+        db1._wait_for_flush()
+        assert db1._flushing_memtable is None
+        assert len(db1._sst_files) == 1
+        assert db1.get("key000") == b"value"
+        assert WriteAheadLog.has_flush_marker_at_end(first_wal)
+        seq_no = db1.seq_no
+        db1.close()
+
+        # only the entry written after the swap is replayed
+        db2 = Database(config)
+        assert db2.seq_no == seq_no
+        assert [entry.key for entry in db2.memtable] == ["during_flush"]
+        assert db2.get("key000") == b"value"
+        db2.close()
+
+
+def test_failed_flush_is_discarded_and_backs_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 200
+
+        attempts = 0
+        original_finalize = SSTableWriter.finalize
+
+        def failing_finalize(self: SSTableWriter) -> None:
+            nonlocal attempts
+            attempts += 1
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(SSTableWriter, "finalize", failing_finalize)
+
+        db = Database(config)
+        for i in range(50):
+            db.put(f"key{i:03d}", b"value")
+        db._wait_for_flush()
+
+        # one attempt despite many writes over the threshold, and no partial
+        # SSTable left behind for the next startup to pick up
+        assert attempts == 1
+        assert list((Path(tmpdir) / "sstables").iterdir()) == []
+        assert db.get("key000") == b"value"
+
+        # an explicit flush retries straight away and, once the error is
+        # gone, gets the data into an SSTable
+        monkeypatch.setattr(SSTableWriter, "finalize", original_finalize)
+        db._flush_memtable_to_sstable()
+        assert len(db._sst_files) == 1
+        assert db._flushing_memtable is None
+        assert db.get("key000") == b"value"
+
+        db.close()
+
+
+def test_flush_marker_failure_keeps_the_flush(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 1_000_000
+
+        def failing_marker(file_path: str, sstable_id: str, sequence: int) -> None:
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(WriteAheadLog, "append_flush_marker", staticmethod(failing_marker))
+
+        db = Database(config)
+        for i in range(20):
+            db.put(f"key{i:02d}", b"value")
+        db._flush_memtable_to_sstable()
+
+        # the SSTable is in place, so the flush counts as done: nothing is
+        # pending, no backoff, and the memtable went back for reuse
+        assert len(db._sst_files) == 1
+        assert db._flushing_memtable is None
+        assert db._flush_failures == 0
+        assert db._spare_memtable is not None and len(db._spare_memtable) == 0
+        assert db.get("key00") == b"value"
+        db.close()
+
+        # the unmarked WAL file is simply replayed on the next startup
+        monkeypatch.undo()
+        db2 = Database(config)
+        assert len(db2.memtable) == 20
+        assert db2.get("key19") == b"value"
+        assert db2.seq_no == 20
+        db2.close()
+
+
+def test_sstable_lookups_check_each_bloom_filter_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = Configuration()
+        config.base_path = tmpdir
+        config.memtable_flush_threshold = 150
+
+        db1 = Database(config)
+        for i in range(30):
+            db1.put(f"key{i:02d}", b"value")
+        db1._flush_memtable_to_sstable()
+        db1.close()
+
+        # get() filters candidates by hash itself, so the readers' own
+        # key-encoding filter check must never run
+        def unexpected_check(self: SSTableReader, key: str) -> bool:
+            raise AssertionError("bloom filter checked twice")
+
+        monkeypatch.setattr(SSTableReader, "might_contain", unexpected_check)
+
+        for parallelism in (1, 4):
+            config.sstable_read_parallelism = parallelism
+            db = Database(config)
+            assert len(db._sst_files) > 1
+            for _ in range(2):  # filters first seen on open, then cached
+                assert db.get("key00") == b"value"
+                assert db.get("key29") == b"value"
+                assert db.get("missing") is None
+            db.close()
@@ -44,6 +44,27 @@ def test_database_entry_validation() -> None:
         DatabaseEntry("key", 0, EntryType.DELETE, b"value")
 
 
+def test_database_entry_value_semantics() -> None:
+    """Entries compare, hash and print by their fields and carry no __dict__."""
+    entry = DatabaseEntry.put("key", 1, b"value", 5)
+    same = DatabaseEntry("key", 1, EntryType.PUT, b"value", 5)
+    
+    assert entry == same
+    assert hash(entry) == hash(same)
+    assert entry != DatabaseEntry.put("key", 2, b"value", 5)
+    assert not hasattr(entry, "__dict__")
+    assert repr(entry) == (
+        "DatabaseEntry(key='key', sequence=1, entry_type=<EntryType.PUT: 1>, "
+        "value=b'value', timestamp=5)"
+    )
+    
+    # the fast constructors still reject bad keys and sequences
+    with pytest.raises(ValueError, match="key cannot be empty"):
+        DatabaseEntry.delete("", 1)
+    with pytest.raises(ValueError, match="sequence number must be non-negative"):
+        DatabaseEntry.put("key", -1, b"value")
+
+
 def test_database_entry_sorting() -> None:
     """Test DatabaseEntry sorting behavior."""
     entry1 = DatabaseEntry.put("a", 1, b"value1")
@@ -166,4 +187,31 @@ def test_round_trip_conversion() -> None:
     assert from_sst.sequence == original.sequence
     assert from_sst.value == original.value
     assert from_sst.entry_type == original.entry_type
-    assert from_sst.timestamp is None  # SSTable doesn't preserve timestamp 
\ No newline at end of file
+    assert from_sst.timestamp is None  # SSTable doesn't preserve timestamp 
+
+def test_key_bytes_cached_on_entry() -> None:
+    entry = DatabaseEntry.put("clé", 1, b"value")
+    assert entry.key_bytes == "clé".encode("utf-8")
+
+    # derived from the key, so it takes no part in equality or repr
+    assert entry == DatabaseEntry.put("clé", 1, b"value")
+    assert "key_bytes" not in repr(entry)
+
+
+def test_sort_key_matches_entry_ordering() -> None:
+    from operator import attrgetter
+
+    entries = [
+        DatabaseEntry.put("b", 1, b"v"),
+        DatabaseEntry.delete("a", 7),
+        DatabaseEntry.put("a", 2, b"v"),
+    ]
+    assert entries[1].sort_key == ("a", 7)
+    assert sorted(entries, key=attrgetter("sort_key")) == sorted(entries)
+
+
+def test_entries_for_the_same_key_share_the_key_string() -> None:
+    """Separately built keys are interned, so versions of a key share one string."""
+    first = DatabaseEntry.put("".join(["hot", "_key"]), 1, b"a")
+    second = DatabaseEntry.delete("".join(["hot", "_", "key"]), 2)
+    assert first.key is second.key
@@ -0,0 +1,67 @@
+import random
+from typing import List, Union
+
+from src.memtable import Memtable
+from src.skiplist import SkipList
+
+
+def test_insert_search_and_order() -> None:
+    memtable = Memtable[str]()
+    for key in [5, 3, 9, 1, 7]:
+        memtable.insert(key, f"v{key}")
+
+    assert memtable.search(3) == "v3"
+    assert memtable.search(4) is None
+    assert len(memtable) == 5
+    assert list(memtable) == ["v1", "v3", "v5", "v7", "v9"]
+
+
+def test_overwrite_and_delete() -> None:
+    memtable = Memtable[str]()
+    memtable.insert(1, "first")
+    memtable.insert(2, "second")
+    assert list(memtable) == ["first", "second"]
+
+    memtable.insert(1, "updated")
+    memtable.insert(0, "zero")
+    memtable.delete(2)
+    memtable.delete(42)  # missing keys are ignored
+
+    assert memtable.search(2) is None
+    assert list(memtable) == ["zero", "updated"]
+
+
+def test_size_matches_skiplist_accounting() -> None:
+    memtable = Memtable[str]()
+    skiplist = SkipList[str]()
+    rng = random.Random(7)
+
+    for _ in range(500):
+        key = rng.randrange(100)
+        if rng.random() < 0.2:
+            memtable.delete(key)
+            skiplist.delete(key)
+        else:
+            value = "x" * rng.randrange(1, 20)
+            memtable.insert(key, value)
+            skiplist.insert(key, value)
+
+    assert memtable.size == skiplist.size
+    assert list(memtable) == list(skiplist)
+
+
+def test_clear_allows_reuse() -> None:
+    tables: List[Union[Memtable[str], SkipList[str]]] = [Memtable(), SkipList()]
+    for table in tables:
+        for key in [3, 1, 2]:
+            table.insert(key, f"v{key}")
+        list(table)
+
+        table.clear()
+        assert table.size == 0
+        assert table.search(1) is None
+        assert list(table) == []
+
+        table.insert(5, "v5")
+        table.insert(4, "v4")
+        assert list(table) == ["v4", "v5"]
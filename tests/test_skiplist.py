@@ -1,3 +1,10 @@
+import random
+from collections import Counter
+from typing import Any, List
+
+import pytest
+
+from src import skiplist as skiplist_module
 from src.skiplist import SkipList
 
 def test_basic_insert_and_search() -> None:
@@ -155,4 +162,86 @@ def test_duplicate_inserts_comprehensive() -> None:
     # Verify all values are still accessible and correct
     assert skiplist.search(1) == "value_4"
     assert skiplist.search(2) == "updated_key2"
-    assert skiplist.search(3) == "key3"
\ No newline at end of file
+    assert skiplist.search(3) == "key3"
+
+def test_delete_then_reinsert_keeps_order() -> None:
+    skiplist = SkipList[str]()
+    for i in [5, 1, 9, 3, 7]:
+        skiplist.insert(i, f"v{i}")
+
+    skiplist.delete(3)
+    assert skiplist.search(3) is None
+
+    skiplist.insert(3, "again")
+    skiplist.insert(9, "updated")
+
+    assert skiplist.search(3) == "again"
+    assert list(skiplist) == ["v1", "again", "v5", "v7", "updated"]
+
+
+def test_random_level_distribution(monkeypatch: pytest.MonkeyPatch) -> None:
+    # a seeded generator of its own, so the process-wide RNG is left alone
+    monkeypatch.setattr(skiplist_module, "random", random.Random(1234))
+    skiplist = SkipList[int](p=0.5, max_level=4)
+    counts = Counter(skiplist._random_level() for _ in range(20000))
+
+    assert set(counts) == {0, 1, 2, 3}
+    # geometric with p=0.5, the top level absorbing the capped tail
+    assert abs(counts[0] / 20000 - 0.5) < 0.02
+    assert abs(counts[1] / 20000 - 0.25) < 0.02
+    assert abs(counts[3] / 20000 - 0.125) < 0.02
+
+
+def test_random_level_distribution_for_other_p(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(skiplist_module, "random", random.Random(4321))
+    skiplist = SkipList[int](p=0.25, max_level=4)
+    counts = Counter(skiplist._random_level() for _ in range(20000))
+
+    assert set(counts) == {0, 1, 2, 3}
+    assert abs(counts[0] / 20000 - 0.75) < 0.02
+    assert abs(counts[1] / 20000 - 0.1875) < 0.02
+    assert abs(counts[3] / 20000 - 0.015625) < 0.01
+
+
+def test_ascending_inserts_mixed_with_deletes_keep_levels_ordered() -> None:
+    rng = random.Random(99)
+    skiplist = SkipList[int](max_level=6)
+    expected = set()
+    for key in range(0, 600, 2):
+        skiplist.insert(key, key)
+        expected.add(key)
+        # delete near the tail (and elsewhere) so the cached tail must follow
+        if rng.random() < 0.3:
+            victim = rng.choice([key, key - 2, rng.randrange(key + 1)])
+            skiplist.delete(victim)
+            expected.discard(victim)
+        # and some out-of-order inserts that take the full walk
+        if rng.random() < 0.2:
+            odd = rng.randrange(key + 1) | 1
+            skiplist.insert(odd, odd)
+            expected.add(odd)
+
+    assert list(skiplist) == sorted(expected)
+    for i in range(skiplist.max_level):
+        level_keys: List[Any] = []
+        node = skiplist.head.forward[i]
+        while node is not None:
+            level_keys.append(node.key)
+            node = node.forward[i]
+        assert level_keys == sorted(level_keys)
+        assert set(level_keys) <= expected
+
+
+def test_default_levels_grow_with_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(5)
+    # node levels come from the skiplist's RNG, so seed that one too
+    monkeypatch.setattr(skiplist_module, "random", random.Random(5))
+    skiplist = SkipList[int]()
+    keys = list(range(5000))
+    rng.shuffle(keys)
+    for key in keys:
+        skiplist.insert(key, key)
+
+    # a 4-level cap would leave the top at 3; log2(5000) is about 12
+    assert skiplist.level >= 8
+    assert list(skiplist) == sorted(keys)
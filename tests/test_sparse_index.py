@@ -1,7 +1,10 @@
 import os
 import tempfile
 
-from src.sstable import SSTableWriter, SSTableReader, IndexEntry
+from src.sstable import (
+    FOOTER_STRUCT, HEADER_SIZE, HEADER_STRUCT, INDEX_HEADER_STRUCT, SSTABLE_MAGIC,
+    IndexEntry, SSTableFeatureFlags, SSTableReader, SSTableWriter, serialize_entry,
+)
 from src.entry import DatabaseEntry
 
 
@@ -39,10 +42,15 @@ def test_sparse_index_creation() -> None:
         reader = SSTableReader(actual_filepath)
         
         # Should have 3 index entries (entries 0, 2, 4)
-        assert len(reader._index_entries) == 3
-        assert reader._index_entries[0].key == "key001"
-        assert reader._index_entries[1].key == "key003"
-        assert reader._index_entries[2].key == "key005"
+        assert len(reader._index_keys) == 3
+        assert reader._index_keys[0] == "key001"
+        assert reader._index_keys[1] == "key003"
+        assert reader._index_keys[2] == "key005"
+        
+        # offsets run parallel to the keys, starting at the first data entry
+        assert len(reader._index_offsets) == 3
+        assert reader._index_offsets[0] == HEADER_SIZE
+        assert list(reader._index_offsets) == sorted(reader._index_offsets)
         
         reader.close()
 
@@ -96,7 +104,7 @@ def test_sparse_index_binary_search() -> None:
         reader = SSTableReader(actual_filepath)
         
         # Should have 20 index entries (0, 5, 10, 15, ..., 95)
-        assert len(reader._index_entries) == 20
+        assert len(reader._index_keys) == 20
         
         # Test lookup that requires binary search
         # key00037 should be found between index entries key00035 and key00040
@@ -168,8 +176,8 @@ def test_no_index_fallback() -> None:
         reader = SSTableReader(actual_filepath)
         
         # Should have only 1 index entry (entry 0)
-        assert len(reader._index_entries) == 1
-        assert reader._index_entries[0].key == "key000"
+        assert len(reader._index_keys) == 1
+        assert reader._index_keys[0] == "key000"
         
         # Should still be able to find keys via linear scan
         for i in range(5):
@@ -201,7 +209,7 @@ def test_index_performance_benefit() -> None:
         reader = SSTableReader(actual_filepath)
         
         # Should have 100 index entries
-        assert len(reader._index_entries) == 100
+        assert len(reader._index_keys) == 100
         
         # Test lookup near the end - should start scan from appropriate index point
         entry = reader.get("key000999")  # Last entry
@@ -240,4 +248,175 @@ def test_unicode_keys_in_index() -> None:
             assert entry.key == key
             assert entry.sequence == i
         
-        reader.close() 
\ No newline at end of file
+        reader.close() 
+
+
+def test_index_lookups_in_any_order() -> None:
+    """Test that lookups find the right entry regardless of the previous lookup position."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sst_path = os.path.join(tmpdir, "test.sst")
+        
+        with SSTableWriter(sst_path, index_interval=4) as writer:
+            for i in range(200):
+                writer.add_entry(DatabaseEntry.put(f"key{i:05d}", i, f"value{i}".encode()))
+            actual_filepath = writer.filepath
+        
+        reader = SSTableReader(actual_filepath)
+        
+        # Forward, backward, repeated and far-apart lookups
+        for i in [0, 1, 5, 6, 50, 49, 199, 198, 3, 120, 120, 7, 180, 0]:
+            entry = reader.get(f"key{i:05d}")
+            assert entry is not None
+            assert entry.sequence == i
+        
+        # Misses before, between and after the indexed keys
+        assert reader.get("a") is None
+        assert reader.get("key00050x") is None
+        assert reader.get("key00000") is not None
+        assert reader.get("zzz") is None
+        assert reader.get("key00001") is not None
+        
+        reader.close()
+
+
+def test_bloom_filter_skips_missing_keys() -> None:
+    """Test that an SSTable written with a bloom filter rules out missing keys."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sst_path = os.path.join(tmpdir, "test.sst")
+        
+        with SSTableWriter(sst_path, features=SSTableFeatureFlags.BLOOM_FILTER, index_interval=10) as writer:
+            for i in range(100):
+                writer.add_entry(DatabaseEntry.put(f"key{i:03d}", i, f"value{i}".encode()))
+            actual_filepath = writer.filepath
+        
+        reader = SSTableReader(actual_filepath)
+        
+        # Every written key passes the filter and is still found
+        for i in range(100):
+            assert reader.might_contain(f"key{i:03d}")
+            entry = reader.get(f"key{i:03d}")
+            assert entry is not None
+            assert entry.sequence == i
+        
+        # Nearly all missing keys are rejected by the filter alone
+        rejected = sum(1 for i in range(1000) if not reader.might_contain(f"missing{i}"))
+        assert rejected > 900
+        assert reader.get("missing") is None
+        
+        reader.close()
+
+
+def test_lookup_tombstones_and_unicode_keys() -> None:
+    """Lookups compare encoded keys, so non-ASCII ordering and tombstones must still work."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sst_path = os.path.join(tmpdir, "test.sst")
+
+        keys = sorted(["apple", "zebra", "éclair", "日本", "banana", "Zulu"])
+        with SSTableWriter(sst_path, index_interval=2) as writer:
+            for i, key in enumerate(keys):
+                if key == "banana":
+                    writer.add_entry(DatabaseEntry.delete(key, i + 1))
+                else:
+                    writer.add_entry(DatabaseEntry.put(key, i + 1, key.encode("utf-8")))
+            actual_filepath = writer.filepath
+
+        reader = SSTableReader(actual_filepath)
+        for key in keys:
+            result = reader.get(key)
+            assert result is not None
+            if key == "banana":
+                assert result.is_tombstone()
+            else:
+                assert result.value == key.encode("utf-8")
+
+        assert reader.get("cherry") is None
+        assert reader.get("ñ") is None
+        reader.close()
+
+
+def test_entries_iterates_all_entries_in_order() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sst_path = os.path.join(tmpdir, "test.sst")
+
+        written = [DatabaseEntry.put(f"key{i:04d}", i, f"value{i}".encode()) for i in range(500)]
+        written[10] = DatabaseEntry.delete("key0010", 10)
+        with SSTableWriter(sst_path, index_interval=16) as writer:
+            for entry in written:
+                writer.add_entry(entry)
+            actual_filepath = writer.filepath
+
+        reader = SSTableReader(actual_filepath)
+        assert list(reader.entries()) == written
+        # point lookups still work after a full scan
+        assert reader.get("key0499") == written[-1]
+        reader.close()
+
+
+def test_compressed_sstable_round_trip() -> None:
+    """Compressed files hold the same entries in fewer bytes, across several blocks."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {}
+        for features in (SSTableFeatureFlags.NONE, SSTableFeatureFlags.COMPRESSION):
+            with SSTableWriter(os.path.join(tmpdir, f"test{features.value}.sst"),
+                               features=features, index_interval=50) as writer:
+                for i in range(5000):
+                    key = f"key{i:05d}"
+                    if i % 7 == 0:
+                        writer.add_entry(DatabaseEntry.delete(key, i))
+                    else:
+                        writer.add_entry(DatabaseEntry.put(key, i, f"value{i}".encode() * 4))
+            paths[features] = writer.filepath
+        
+        plain_size = os.path.getsize(paths[SSTableFeatureFlags.NONE])
+        compressed_path = paths[SSTableFeatureFlags.COMPRESSION]
+        assert os.path.getsize(compressed_path) < plain_size // 2
+        
+        reader = SSTableReader(compressed_path)
+        plain_reader = SSTableReader(paths[SSTableFeatureFlags.NONE])
+        
+        # index offsets point at block starts, so several entries share one
+        assert len(set(reader._index_offsets)) < len(reader._index_offsets)
+        
+        for i in [0, 1, 7, 4999, 2500, 1234, 1235, 3000, 49, 50]:
+            entry = reader.get(f"key{i:05d}")
+            assert entry is not None
+            assert entry.sequence == i
+            assert entry.is_tombstone() == (i % 7 == 0)
+            if i % 7:
+                assert entry.value == f"value{i}".encode() * 4
+        
+        assert reader.get("a") is None
+        assert reader.get("key02500x") is None
+        assert reader.get("zzz") is None
+        
+        assert list(reader.entries()) == list(plain_reader.entries())
+        
+        reader.close()
+        plain_reader.close()
+
+
+def test_version_1_index_is_still_readable() -> None:
+    """Files written before the packed index layout load through the legacy parser."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        entries = [DatabaseEntry.put(f"k\u00e9y{i:03d}", i, f"value{i}".encode()) for i in range(20)]
+        data = bytearray()
+        offsets = {}
+        for e in entries:
+            offsets[e.key] = HEADER_SIZE + len(data)
+            data += serialize_entry(e)
+        index = [IndexEntry(e.key, offsets[e.key]) for e in entries[::5]]
+        
+        header = HEADER_STRUCT.pack(SSTABLE_MAGIC, 1, 0, b"\x00" * 16, 0, len(entries), len(data), 0)
+        index_offset = HEADER_SIZE + len(data)
+        index_bytes = INDEX_HEADER_STRUCT.pack(len(index)) + b"".join(e.serialize() for e in index)
+        path = os.path.join(tmpdir, "legacy.sst")
+        with open(path, "wb") as f:
+            f.write(header + data + index_bytes + FOOTER_STRUCT.pack(0, index_offset, 0))
+        
+        reader = SSTableReader(path)
+        assert reader._index_keys == [e.key for e in index]
+        assert list(reader._index_offsets) == [e.file_offset for e in index]
+        for e in entries:
+            assert reader.get(e.key) == e
+        assert reader.get("missing") is None
+        reader.close()
@@ -3,7 +3,7 @@ import struct
 from pathlib import Path
 
 import pytest
-from src.sstable import MAX_KEY_SIZE, MAX_VALUE_SIZE, serialize_entry, deserialize_entry, SSTableFeatureFlags, SSTableWriter
+from src.sstable import MAX_KEY_SIZE, MAX_NAME_COLLISIONS, MAX_VALUE_SIZE, serialize_entry, serialize_entry_into, deserialize_entry, SSTableFeatureFlags, SSTableWriter
 from src.entry import DatabaseEntry
 
 
@@ -119,6 +119,17 @@ def test_duplicate_keys_not_allowed(temp_sstable: str) -> None:
             writer.add_entry(DatabaseEntry.put("a", 2, b"2"))
 
 
+def test_sort_order_checks_handle_non_ascii_keys(temp_sstable: str) -> None:
+    with SSTableWriter(temp_sstable) as writer:
+        for i, key in enumerate(sorted(["z", "é", "日本", "Ω"])):
+            writer.add_entry(DatabaseEntry.put(key, i, b"v"))
+
+        with pytest.raises(ValueError, match="Duplicate key"):
+            writer.add_entry(DatabaseEntry.put("日本", 9, b"v"))
+        with pytest.raises(ValueError, match="sorted order"):
+            writer.add_entry(DatabaseEntry.put("é", 10, b"v"))
+
+
 def test_value_error_triggers_discard(temp_sstable: str) -> None:
     with SSTableWriter(temp_sstable) as writer:
         writer.add_entry(DatabaseEntry.put("b", 1, b"2"))
@@ -160,4 +171,67 @@ def test_sequence_number_handling() -> None:
         deserialized, _ = deserialize_entry(serialized)
         assert deserialized.sequence == entry.sequence
         assert deserialized.key == entry.key
-        assert deserialized.value == entry.value
\ No newline at end of file
+        assert deserialized.value == entry.value
+
+def test_data_checksum_spans_multiple_pages(temp_sstable: str) -> None:
+    import zlib
+    from src.sstable import DATA_PAGE_SIZE, FOOTER_FORMAT, FOOTER_SIZE, HEADER_SIZE, SSTableReader
+
+    entries = [DatabaseEntry.put(f"key{i:04d}", i, bytes([i % 256]) * 1000) for i in range(200)]
+    writer = SSTableWriter(temp_sstable)
+    for entry in entries:
+        writer.add_entry(entry)
+    writer.finalize()
+
+    expected_data = b"".join(serialize_entry(e) for e in entries)
+    assert len(expected_data) > 2 * DATA_PAGE_SIZE
+    assert writer.data_size == len(expected_data)
+
+    with open(writer.filepath, "rb") as f:
+        contents = f.read()
+    assert contents[HEADER_SIZE:HEADER_SIZE + len(expected_data)] == expected_data
+    data_crc, _, _ = struct.unpack(FOOTER_FORMAT, contents[-FOOTER_SIZE:])
+    assert data_crc == zlib.crc32(expected_data)
+
+    reader = SSTableReader(writer.filepath)
+    try:
+        for i in (0, 99, 199):
+            result = reader.get(f"key{i:04d}")
+            assert result is not None and result.value == entries[i].value
+    finally:
+        reader.close()
+
+
+def test_serialize_entry_into_appends_in_place() -> None:
+    buf = bytearray(b"prefix")
+    entries = [DatabaseEntry.put("key1", 1, b"value1"), DatabaseEntry.delete("key2", 2)]
+    for entry in entries:
+        assert serialize_entry_into(buf, entry) == len(serialize_entry(entry))
+    assert bytes(buf) == b"prefix" + b"".join(serialize_entry(e) for e in entries)
+
+    # an invalid entry leaves the buffer as it was
+    with pytest.raises(ValueError):
+        serialize_entry_into(buf, DatabaseEntry.put("big", 3, b"x" * (MAX_VALUE_SIZE + 1)))
+    assert bytes(buf) == b"prefix" + b"".join(serialize_entry(e) for e in entries)
+
+
+def test_name_collisions_get_ordered_suffixes(temp_sstable: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    # every writer sees the same timestamp
+    monkeypatch.setattr(SSTableWriter, "_get_timestamped_path",
+                        lambda self: f"{temp_sstable}.20240101120000000000")
+
+    writers = [SSTableWriter(temp_sstable) for _ in range(3)]
+    names = [os.path.basename(w.filepath) for w in writers]
+    for writer in writers:
+        writer.finalize()
+
+    assert names == ["test.sst.20240101120000000000", "test.sst.20240101120000000000-01",
+                     "test.sst.20240101120000000000-02"]
+    # the suffixed names still sort between that timestamp and the next one
+    later = "test.sst.20240101120000000001"
+    assert sorted(names + [later]) == names + [later]
+
+    for i in range(3, MAX_NAME_COLLISIONS + 1):
+        Path(f"{temp_sstable}.20240101120000000000-{i:02d}").touch()
+    with pytest.raises(FileExistsError):
+        SSTableWriter(temp_sstable)
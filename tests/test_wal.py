@@ -6,6 +6,7 @@ import struct
 import zlib
 from datetime import datetime
 
+from src import wal as wal_module
 from src.wal import WALOperationType, WALEntry, WriteAheadLog, MAX_KEY_BYTES, MAX_VALUE_BYTES
 from src.entry import DatabaseEntry, EntryType
 
@@ -360,6 +361,43 @@ def test_has_flush_marker_at_end_comprehensive() -> None:
         assert WriteAheadLog.has_flush_marker_at_end(actual_path_3) is False
 
 
+def test_read_flush_marker_at_end_returns_marker() -> None:
+    """The trailing FLUSH marker is returned, including after a torn trailing write."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = WriteAheadLog(os.path.join(tmpdir, "test.wal"))
+        # enough entries that the header walk covers many records
+        for i in range(200):
+            wal.write_to_log(DatabaseEntry.put(f"key{i:04d}", i + 1, b"x" * 32))
+        wal.write_flush_marker("sstable_789", 201)
+        path = wal.current_path
+        wal.close()
+        
+        marker = WriteAheadLog.read_flush_marker_at_end(path)
+        assert marker is not None
+        assert marker.sequence == 201
+        assert marker.get_flushed_sstable_id() == "sstable_789"
+        
+        # a partial record after the marker is ignored by the full-scan fallback
+        with open(path, 'ab') as f:
+            f.write(b"\x00" * 5)
+        marker = WriteAheadLog.read_flush_marker_at_end(path)
+        assert marker is not None
+        assert marker.sequence == 201
+
+
+def test_flush_marker_bytes_inside_a_value_are_not_a_marker() -> None:
+    """A value ending in a serialized FLUSH record must not mark the file as flushed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = WriteAheadLog(os.path.join(tmpdir, "test.wal"))
+        fake_marker = WALEntry.flush(1700000000, 99).serialize()
+        wal.write_to_log(DatabaseEntry.put("important", 1, b"data"))
+        wal.write_to_log(DatabaseEntry.put("blob", 2, b"payload" + fake_marker))
+        path = wal.current_path
+        wal.close()
+        
+        assert WriteAheadLog.read_flush_marker_at_end(path) is None
+
+
 def test_sequence_number_increment() -> None:
     with tempfile.TemporaryDirectory() as tmpdir:
         wal_path = os.path.join(tmpdir, "test.wal")
@@ -446,4 +484,110 @@ def test_value_size_consistency_with_sstable() -> None:
         serialized = serialize_entry(entry)
         assert len(serialized) > 0
         
-        wal.close()
\ No newline at end of file
+        wal.close()
+
+def test_concurrent_writers_share_fsync(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Writers that arrive during an fsync are covered by a single follow-up fsync."""
+    import threading
+    import time
+
+    real_fsync = wal_module._datasync
+    fsync_calls = 0
+
+    def slow_fsync(fd: int) -> None:
+        nonlocal fsync_calls
+        fsync_calls += 1
+        time.sleep(0.02)
+        real_fsync(fd)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = WriteAheadLog(os.path.join(tmpdir, "test.wal"))
+        monkeypatch.setattr(wal_module, "_datasync", slow_fsync)
+
+        writer_count = 16
+        threads = [
+            threading.Thread(target=wal.write_to_log, args=(DatabaseEntry.put(f"key{i}", i, b"value"),))
+            for i in range(writer_count)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert fsync_calls < writer_count
+
+        monkeypatch.setattr(wal_module, "_datasync", real_fsync)
+        wal.close()
+
+        keys = sorted(e.key for e in WriteAheadLog.read_all_entries(wal.current_path))
+        assert keys == sorted(f"key{i}" for i in range(writer_count))
+
+
+def test_unsynced_write_is_durable_after_sync(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = WriteAheadLog(os.path.join(tmpdir, "test.wal"))
+
+        fsync_calls: list[int] = []
+        real_fsync = wal_module._datasync
+
+        def counting_fsync(fd: int) -> None:
+            fsync_calls.append(fd)
+            real_fsync(fd)
+
+        monkeypatch.setattr(wal_module, "_datasync", counting_fsync)
+
+        wal.write_to_log(DatabaseEntry.put("key1", 1, b"value1"), sync=False)
+        wal.write_to_log(DatabaseEntry.put("key2", 2, b"value2"), sync=False)
+        assert fsync_calls == []
+
+        wal.sync()
+        assert len(fsync_calls) == 1
+
+        # nothing new since the last sync, so no extra fsync
+        wal.sync()
+        assert len(fsync_calls) == 1
+
+        entries = list(WriteAheadLog.read_all_entries(wal.current_path))
+        assert [e.key for e in entries] == ["key1", "key2"]
+        wal.close()
+
+
+def test_serialize_entry_matches_wal_entry_serialization() -> None:
+    """Serializing straight from a DatabaseEntry gives the same record as going through WALEntry."""
+    for entry in [DatabaseEntry.put("ключ", 7, b"value", 1700000000),
+                  DatabaseEntry.delete("gone", 8, 1700000001)]:
+        record = bytearray()
+        WriteAheadLog._serialize_entry_into(record, entry)
+        assert record == WALEntry.from_database_entry(entry).serialize()
+        assert WALEntry.deserialize(record).to_database_entry() == entry
+
+
+def test_serialize_record_into_appends_records_back_to_back() -> None:
+    """Records gathered into one buffer are identical to separately serialized ones."""
+    buf = bytearray(b"prefix")
+    first = WALEntry.serialize_record_into(buf, 1, 1700000000, WALOperationType.PUT.value, b"a", b"1")
+    second = WALEntry.serialize_record_into(buf, 2, 1700000000, WALOperationType.DELETE.value, b"b", b"")
+
+    record_a = WALEntry.put(1700000000, "a", b"1", 1).serialize()
+    record_b = WALEntry.delete(1700000000, "b", 2).serialize()
+    assert (first, second) == (len(record_a), len(record_b))
+    assert bytes(buf) == b"prefix" + record_a + record_b
+
+
+def test_abandoned_replay_releases_the_mapped_file() -> None:
+    """Replay hands out views into the map; stopping early must still let it close."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = WriteAheadLog(os.path.join(tmpdir, "test.wal"))
+        for i in range(5):
+            wal.write_to_log(DatabaseEntry.put(f"key{i}", i, f"value{i}".encode()))
+        wal.close()
+
+        entries = WriteAheadLog.read_all_entries(wal.current_path)
+        first = next(entries)
+        # dropping the generator closes it, which would raise BufferError
+        # if a view into the map were still held
+        del entries
+
+        assert first.key == "key0"
+        assert first.value == b"value0"
+        assert type(first.value) is bytes